@@ -0,0 +1,210 @@
+"""
+Throughput and latency benchmarks, results are written as JSON so that runs can be compared.
+
+    python -m benchmarks.run_benchmarks --output results.json
+    python -m benchmarks.run_benchmarks --output new.json --compare results.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import numpy as np
+from gomoku.envs import GomokuEnv
+from gomoku.envs.bitboard import BitBoard
+from gomoku.envs.board import Board
+from gomoku.envs.opponent import EasyAgent, RandomAgent
+
+BOARD_SIZES = [9, 15, 19]
+# number of stones on the board for the agent latency benchmarks
+GAME_PHASES = {'early': 4, 'mid': 40, 'late': 100}
+
+
+def _random_game(board_class, board_size):
+    """
+    :return: moves played until five in a row or a full board
+    """
+    positions = [[row, col] for row in range(board_size) for col in range(board_size)]
+    random.shuffle(positions)
+    board = board_class(board_size)
+    for number_of_moves, position in enumerate(positions, 1):
+        have_five, is_full = board.step(position)
+        if have_five or is_full:
+            return number_of_moves
+
+
+def bench_board_step(board_class, board_size, min_time):
+    """
+    :return: moves per second over random games, board construction included
+    """
+    moves, start = 0, time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        moves += _random_game(board_class, board_size)
+    return moves / (time.perf_counter() - start)
+
+
+def bench_add_stone(board_size, min_time, bucket_size=25):
+    """
+    :return: {"<first>-<last>": mean BoardPattern.add_stone microseconds} by number of stones already placed
+    """
+    timings = {}
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        board = Board(board_size)
+        board_patterns = board.board_patterns
+        add_stone = board_patterns.add_stone
+
+        def timed_add_stone(stone):
+            before = time.perf_counter()
+            add_stone(stone)
+            timings.setdefault(stone.step - 1, []).append(time.perf_counter() - before)
+
+        board_patterns.add_stone = timed_add_stone
+        positions = [[row, col] for row in range(board_size) for col in range(board_size)]
+        random.shuffle(positions)
+        for position in positions:
+            have_five, is_full = board.step(position)
+            if have_five or is_full:
+                break
+    result = {}
+    for first in range(0, board_size ** 2, bucket_size):
+        samples = [t for stones in range(first, first + bucket_size) for t in timings.get(stones, [])]
+        if len(samples) > 0:
+            result['{}-{}'.format(first, first + bucket_size - 1)] = 1e6 * float(np.mean(samples))
+    return result
+
+
+def _position(board_size, number_of_stones):
+    """
+    :return: board with random stones and no five in a row, black to move
+    """
+    while True:
+        board = Board(board_size)
+        positions = [[row, col] for row in range(board_size) for col in range(board_size)]
+        random.shuffle(positions)
+        for position in positions[:number_of_stones]:
+            have_five, _ = board.step(position)
+            if have_five:
+                break
+        else:
+            return board
+
+
+def bench_agent_predict(agent_class, board_size, number_of_stones, repeats):
+    """
+    :return: mean predict() microseconds
+    """
+    board = _position(board_size, number_of_stones)
+    agent = agent_class(board, board.current_stone_color)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        agent.predict(None)
+    return 1e6 * (time.perf_counter() - start) / repeats
+
+
+def bench_env_episodes(board_size, min_time):
+    """
+    :return: (episodes per second, env steps per second) with random legal actions against EasyAgent
+    """
+    env = GomokuEnv(board_size)
+    episodes, steps, start = 0, 0, time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        obs, done = env.reset(), False
+        while not done:
+            action = int(random.choice(np.flatnonzero(obs == 0)))
+            obs, _, done, _ = env.step(action)
+            steps += 1
+        episodes += 1
+    elapsed = time.perf_counter() - start
+    return episodes / elapsed, steps / elapsed
+
+
+def run(min_time=1.0, repeats=200):
+    results = {}
+    # the first board of a size builds the shape and line tables, keep that out of the timings
+    for board_size in BOARD_SIZES:
+        Board(board_size)
+    for board_size in BOARD_SIZES:
+        results['board_step_moves_per_s/{}'.format(board_size)] = bench_board_step(Board, board_size, min_time)
+        results['bitboard_step_moves_per_s/{}'.format(board_size)] = bench_board_step(BitBoard, board_size,
+                                                                                      min_time)
+    for stones, microseconds in bench_add_stone(19, min_time).items():
+        results['add_stone_us/19/{}'.format(stones)] = microseconds
+    for agent_class in [EasyAgent, RandomAgent]:
+        for phase, number_of_stones in GAME_PHASES.items():
+            results['{}_predict_us/15/{}'.format(agent_class.__name__, phase)] = \
+                bench_agent_predict(agent_class, 15, number_of_stones, repeats)
+    episodes, steps = bench_env_episodes(15, min_time)
+    results['env_episodes_per_s/15'] = episodes
+    results['env_steps_per_s/15'] = steps
+    return results
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+    }
+
+
+def _higher_is_better(name):
+    return '_per_s' in name
+
+
+def compare(results, baseline, tolerance):
+    """
+    print the change against a baseline run
+    :return: names of the benchmarks that got slower by more than tolerance
+    """
+    regressions = []
+    for name, value in sorted(results.items()):
+        if name not in baseline:
+            continue
+        ratio = value / baseline[name] if _higher_is_better(name) else baseline[name] / value
+        print('{:45s} {:12.1f} {:12.1f} {:6.2f}x'.format(name, baseline[name], value, ratio))
+        if ratio < 1 - tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Run the Gomoku benchmarks.')
+    parser.add_argument('--output', default=None, help='write the results to this JSON file')
+    parser.add_argument('--compare', default=None, help='JSON file of a previous run')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown against --compare')
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds per throughput benchmark')
+    parser.add_argument('--repeats', type=int, default=200, help='predict() calls per latency benchmark')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(args)
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    results = run(args.min_time, args.repeats)
+    report = {'metadata': _metadata(), 'results': results}
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare is not None:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance)
+        if len(regressions) > 0:
+            print('slower than baseline: ' + ', '.join(regressions))
+            return 1
+    else:
+        for name, value in sorted(results.items()):
+            print('{:45s} {:12.1f}'.format(name, value))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,15 @@
-from gym.envs.registration import register
+def register_envs():
+    """
+    register gomoku-v0 with gym, also the 'gym.envs' entry point of the package
+    """
+    from gym.envs.registration import register, registry
+    if 'gomoku-v0' not in registry:
+        register(
+            id='gomoku-v0',
+            entry_point='gomoku.envs:GomokuEnv',
+            kwargs={},
+        )
 
-register(
-    id='gomoku-v0',
-    entry_point='gomoku.envs:GomokuEnv',
-    kwargs={},
-)
\ No newline at end of file
+
+# registered on import, so that gym.make('gomoku-v0') works after importing gomoku, installed or not
+register_envs()
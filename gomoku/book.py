@@ -0,0 +1,200 @@
+import argparse
+import functools
+import numpy as np
+from gomoku.envs.boardUtils import StoneColor, zobrist_keys
+from gomoku.envs.opponent import Agent, EasyAgent
+from gomoku.symmetry import NUMBER_OF_SYMMETRIES, symmetry_permutations
+
+# one row per (position, move), sorted by hash then move
+# hash: canonical_hash() of the position, move: row * board_size + col in the canonical position
+# count: games that played the move, score: sum of their results for the color that played it
+BOOK_DTYPE = np.dtype([
+    ('hash', '<u8'),
+    ('move', '<u2'),
+    ('count', '<u4'),
+    ('score', '<i4'),
+])
+
+
+@functools.lru_cache()
+def _symmetric_keys(board_size):
+    """
+    :return: (keys, side_key), keys[color][k, cell] is the Zobrist key of a stone on cell moved by symmetry k
+    """
+    keys, side_key = zobrist_keys(board_size)
+    _, inverse_permutations = symmetry_permutations(board_size)
+    symmetric_keys = {color: np.array(keys[color], dtype=np.uint64)[inverse_permutations]
+                      for color in [StoneColor.black, StoneColor.white]}
+    return symmetric_keys, np.uint64(side_key)
+
+
+def _canonical(hashes):
+    """
+    :param hashes: (8,) hash of the position moved by every symmetry
+    :return: (hash, transform), the smallest hash and its symmetry
+    """
+    transform = int(hashes.argmin())
+    return int(hashes[transform]), transform
+
+
+def canonical_hash(board_state, current_stone_color):
+    """
+    smallest Zobrist key of the 8 symmetric copies of the position, the same for all of them
+    :param board_state: (board_size, board_size) array, 1 for black and -1 for white stones
+    :return: (hash, transform), transform is the index of the symmetry in gomoku.symmetry giving the hash
+    """
+    board_size = board_state.shape[0]
+    keys, side_key = _symmetric_keys(board_size)
+    flat_board_state = np.asarray(board_state).reshape(-1)
+    hashes = np.zeros(NUMBER_OF_SYMMETRIES, dtype=np.uint64)
+    for color in [StoneColor.black, StoneColor.white]:
+        cells = np.flatnonzero(flat_board_state == color.value)
+        hashes ^= np.bitwise_xor.reduce(keys[color][:, cells], axis=1)
+    if current_stone_color == StoneColor.white:
+        hashes ^= side_key
+    return _canonical(hashes)
+
+
+def build_book(games, max_ply=10, min_count=1):
+    """
+    :param games: GameRecords of one board size, e.g. a GameRecordReader
+    :param max_ply: positions of the first max_ply moves of every game are added
+    :param min_count: moves played in fewer games are left out
+    :return: sorted BOOK_DTYPE array
+    """
+    stats = {}
+    for game in games:
+        keys, side_key = _symmetric_keys(game.board_size)
+        _, inverse_permutations = symmetry_permutations(game.board_size)
+        hashes = np.zeros(NUMBER_OF_SYMMETRIES, dtype=np.uint64)
+        color = StoneColor.black
+        for move in np.asarray(game.moves[:max_ply]).tolist():
+            hash_key, transform = _canonical(hashes)
+            entry = stats.setdefault((hash_key, int(inverse_permutations[transform, move])), [0, 0])
+            entry[0] += 1
+            entry[1] += game.result * color.value
+            # the moves are played in turn, the side key changes on every move
+            hashes ^= keys[color][:, move] ^ side_key
+            color = color.next()
+    rows = sorted((hash_key, move, count, score) for (hash_key, move), (count, score) in stats.items()
+                  if count >= min_count)
+    return np.array(rows, dtype=BOOK_DTYPE)
+
+
+class OpeningBook(object):
+    """
+    Moves played from positions of recorded games, looked up by binary search on the canonical hash.
+
+    A book saved with save() and opened with load() is memory-mapped read-only, processes that open the same
+    file share its pages, and a loaded book is pickled as its path so that a process pool opens the file
+    instead of copying the entries.
+    """
+    def __init__(self, entries, path=None):
+        """
+        :param entries: sorted BOOK_DTYPE array, e.g. from build_book()
+        """
+        self._entries = entries
+        self._path = path
+
+    @classmethod
+    def load(cls, path):
+        return cls(np.load(path, mmap_mode='r'), path)
+
+    def save(self, path):
+        np.save(path, np.asarray(self._entries, dtype=BOOK_DTYPE))
+
+    def __reduce__(self):
+        if self._path is not None:
+            return OpeningBook.load, (self._path,)
+        return OpeningBook, (np.asarray(self._entries),)
+
+    def moves(self, board_state, current_stone_color):
+        """
+        :return: [((row, col), count, score)] book moves of the position, count and score are from the view of
+                 the color to move
+        """
+        board_size = board_state.shape[0]
+        hash_key, transform = canonical_hash(board_state, current_stone_color)
+        hashes = self._entries['hash']
+        start = int(np.searchsorted(hashes, np.uint64(hash_key), side='left'))
+        end = int(np.searchsorted(hashes, np.uint64(hash_key), side='right'))
+        permutations, _ = symmetry_permutations(board_size)
+        result = []
+        for entry in self._entries[start:end]:
+            # back from the canonical position to the board
+            cell = int(permutations[transform, int(entry['move'])])
+            result.append((divmod(cell, board_size), int(entry['count']), int(entry['score'])))
+        return result
+
+    def choose(self, board_state, current_stone_color, min_count=1, randomness=True):
+        """
+        :return: (row, col) of a book move played in at least min_count games, None if there is none;
+                 drawn in proportion to its games if randomness, otherwise the move with the best mean score
+        """
+        moves = [move for move in self.moves(board_state, current_stone_color) if move[1] >= min_count]
+        if len(moves) == 0:
+            return None
+        if randomness:
+            counts = np.array([count for _, count, _ in moves], dtype=float)
+            return moves[np.random.choice(len(moves), p=counts / counts.sum())][0]
+        return max(moves, key=lambda move: (move[2] / move[1], move[1]))[0]
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def entries(self):
+        return self._entries
+
+
+class BookAgent(Agent):
+    """
+    Plays book moves while the position is in the book, then the moves of agent_class, e.g.
+        functools.partial(BookAgent, book=OpeningBook.load(path), agent_class=MinimaxAgent)
+    can be used as the opponent_class of GomokuEnv or as an agent class of gomoku.selfplay.
+    """
+    def __init__(self, board, stone_color, randomness=True, book=None, agent_class=EasyAgent, min_count=1):
+        Agent.__init__(self, board, stone_color, randomness)
+        self._book = book
+        self._agent = agent_class(board, stone_color, randomness)
+        self._min_count = min_count
+        self._book_moves = 0
+
+    def predict(self, obs=None):
+        if self._book is not None:
+            move = self._book.choose(self._board.board_state, self._board.current_stone_color,
+                                     self._min_count, self._randomness)
+            if move is not None:
+                self._book_moves += 1
+                return list(move), None
+        return self._agent.predict(obs)
+
+    @property
+    def agent(self):
+        return self._agent
+
+    @property
+    def book_moves(self):
+        """
+        number of moves played from the book
+        """
+        return self._book_moves
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Build an opening book from a game record file.')
+    parser.add_argument('games', help='game record file written by gomoku.selfplay --output')
+    parser.add_argument('output', help='.npy file of the book')
+    parser.add_argument('--max-ply', type=int, default=10)
+    parser.add_argument('--min-count', type=int, default=1)
+    args = parser.parse_args(args)
+
+    # imported here, only needed to read the games
+    from gomoku.record import GameRecordReader
+    entries = build_book(GameRecordReader(args.games), args.max_ply, args.min_count)
+    OpeningBook(entries).save(args.output)
+    print('positions: {} moves: {}'.format(len(np.unique(entries['hash'])), len(entries)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,6 @@
-from gomoku.envs.gomoku_env import GomokuEnv
\ No newline at end of file
+def __getattr__(name):
+    # imported when it is used, the board and the agents do not need the env module
+    if name == 'GomokuEnv':
+        from gomoku.envs.gomoku_env import GomokuEnv
+        return GomokuEnv
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
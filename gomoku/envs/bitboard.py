@@ -0,0 +1,137 @@
+import numpy as np
+from gomoku.envs.board import BoardPositionAlreadyTaken
+from gomoku.envs.boardUtils import StoneColor
+
+
+class BitBoard(object):
+    """
+    Board engine that stores the stones of each color as a packed integer bitmask.
+
+    Cell (row, col) is bit row * (board_size + 1) + col. The extra guard column in
+    every row is never set, so shifting by 1 (along a row), board_size + 1 (along a
+    column), board_size + 2 (diagonal) and board_size (anti-diagonal) never wraps
+    a line onto the next one, and five in a row is found with a few shifts and ANDs.
+    """
+    def __init__(self, board_size=15):
+        self._board_size = board_size
+        self._row_stride = board_size + 1
+        self._shifts = (1, board_size + 1, board_size + 2, board_size)
+        # every position on the board, without the guard column
+        self._board_mask = sum(1 << (row * self._row_stride + col)
+                               for row in range(board_size) for col in range(board_size))
+        self.reset()
+
+    def reset(self):
+        """
+        reset the board
+        """
+        self._current_stone_color = StoneColor.black
+        self._current_step = 0
+        self._board_state = np.zeros((self._board_size, self._board_size), dtype=np.int8)
+        # bitmask for black stones and white stones
+        self._bits = [0, 0]
+
+    def step(self, action):
+        """
+        :param action: [row, column]
+        :return: (have_five, is_full)
+        """
+        row, col = action
+
+        bit = 1 << (row * self._row_stride + col)
+        if (self._bits[0] | self._bits[1]) & bit:
+            raise BoardPositionAlreadyTaken
+
+        self._current_step += 1
+        index = 0 if self._current_stone_color == StoneColor.black else 1
+        self._bits[index] |= bit
+        self._board_state[row][col] = self._current_stone_color.value
+
+        have_five = self._five_in_a_row(self._bits[index])
+        is_full = self._current_step >= self._board_size ** 2
+        if not(have_five or is_full):
+            self._current_stone_color = self._current_stone_color.next()
+
+        return have_five, is_full
+
+    @classmethod
+    def from_board_state(cls, board_state, current_stone_color):
+        """
+        :param board_state: (board_size, board_size) array, e.g. Board.board_state
+        :param current_stone_color: color to move
+        """
+        bit_board = cls(board_state.shape[0])
+        for row, col in zip(*np.nonzero(board_state)):
+            index = 0 if board_state[row][col] == StoneColor.black.value else 1
+            bit_board._bits[index] |= 1 << (int(row) * bit_board._row_stride + int(col))
+            bit_board._board_state[row][col] = board_state[row][col]
+            bit_board._current_step += 1
+        bit_board._current_stone_color = current_stone_color
+        return bit_board
+
+    def copy(self):
+        bit_board = BitBoard.__new__(BitBoard)
+        bit_board._board_size = self._board_size
+        bit_board._row_stride = self._row_stride
+        bit_board._shifts = self._shifts
+        bit_board._board_mask = self._board_mask
+        bit_board._current_stone_color = self._current_stone_color
+        bit_board._current_step = self._current_step
+        bit_board._board_state = self._board_state.copy()
+        bit_board._bits = list(self._bits)
+        return bit_board
+
+    def winning_positions(self, color):
+        """
+        :return: empty positions where a stone of the color makes five in a row, as (row, col) tuples
+        """
+        bits = self._bits[0 if color == StoneColor.black else 1]
+        empty = self._board_mask & ~(self._bits[0] | self._bits[1])
+        winning = 0
+        for shift in self._shifts:
+            # after[k] / before[k]: k stones of the color right after / before the position along the line
+            after, before = [0] * 5, [0] * 5
+            after[1], before[1] = bits >> shift, bits << shift
+            for k in range(2, 5):
+                after[k] = after[k - 1] & (bits >> (k * shift))
+                before[k] = before[k - 1] & (bits << (k * shift))
+            winning |= after[4] | before[4] | (before[1] & after[3]) | (before[2] & after[2]) | \
+                (before[3] & after[1])
+        winning &= empty
+        positions = []
+        while winning:
+            bit = winning & -winning
+            positions.append(divmod(bit.bit_length() - 1, self._row_stride))
+            winning ^= bit
+        return positions
+
+    def _five_in_a_row(self, bits):
+        for shift in self._shifts:
+            two = bits & (bits >> shift)
+            four = two & (two >> (2 * shift))
+            if four & (bits >> (4 * shift)):
+                return True
+        return False
+
+    def position_exist(self, row, col):
+        return 0 <= row < self.board_size and 0 <= col < self.board_size
+
+    @property
+    def board_size(self):
+        return self._board_size
+
+    @property
+    def board_state(self):
+        return self._board_state
+
+    @property
+    def current_stone_color(self):
+        return self._current_stone_color
+
+    @property
+    def black_bits(self):
+        return self._bits[0]
+
+    @property
+    def white_bits(self):
+        return self._bits[1]
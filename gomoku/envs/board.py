@@ -1,27 +1,88 @@
-import matplotlib.pyplot as plt
+import collections
+import contextlib
+import functools
 import numpy as np
-from gomoku.envs.boardUtils import BoardPattern, Stone, StoneColor
+from gomoku.envs.boardUtils import BoardPattern, CellIndex, Stone, StoneColor, stone_count_squared, zobrist_keys
+from gomoku.envs.shape import BoardShape
 
 
 class BoardPositionAlreadyTaken(Exception):
     pass
 
 
+class NoStoneToUndo(Exception):
+    pass
+
+
+# compact picklable position, moves: row * board_size + col of every stone as little-endian uint16 bytes,
+# current_stone_color: StoneColor value of the color to move
+BoardSnapshot = collections.namedtuple('BoardSnapshot', ['board_size', 'moves', 'current_stone_color'])
+
+
+@functools.lru_cache()
+def _neighbour_cells(board_size, distance):
+    """
+    :return: neighbours[cell], the cells other than cell at most distance rows and columns away from it
+    """
+    neighbours = []
+    for row in range(board_size):
+        for col in range(board_size):
+            neighbours.append([r * board_size + c
+                               for r in range(max(row - distance, 0), min(row + distance + 1, board_size))
+                               for c in range(max(col - distance, 0), min(col + distance + 1, board_size))
+                               if (r, c) != (row, col)])
+    return neighbours
+
+
 class Board(object):
-    def __init__(self, board_size=15):
+    def __init__(self, board_size=15, shaping=stone_count_squared, frontier_distance=1):
+        """
+        :param shaping: shaping(number_of_stones, free_end_number), value of a pattern summed by
+                        BoardPattern.shaping_total()
+        :param frontier_distance: the frontier is the empty positions at most frontier_distance rows and
+                                  columns away from a stone
+        """
         self._board_size = board_size
+        self._shaping = shaping
+        self._frontier_distance = frontier_distance
+        self._neighbours = _neighbour_cells(board_size, frontier_distance)
+        self._zobrist_keys, self._zobrist_side_key = zobrist_keys(board_size)
+        # created by the first render('rgb_array'), kept across resets
+        self._rasterizer = None
+        self._allocate_arrays()
         self.reset()
 
+    def _allocate_arrays(self):
+        """
+        the arrays are only filled in place afterwards, views of them stay valid for the life of the board
+        """
+        self._board_state = np.zeros((self._board_size, self._board_size), dtype=np.int8)
+        self._flat_board_state = self._board_state.reshape(-1)
+        self._flat_board_state.setflags(write=False)
+        self._legal_action_mask = np.ones(self._board_size ** 2, dtype=bool)
+        self._legal_action_mask_view = self._legal_action_mask.view()
+        self._legal_action_mask_view.setflags(write=False)
+
     def reset(self):
         """
         reset the board
         """
         self._current_stone_color = StoneColor.black
         self._current_step = 0
-        self._board_state = np.zeros((self._board_size, self._board_size), dtype=int)
+        self._board_state[:] = 0
+        self._moves = []
+        # the stones and patterns of a cloned or restored board are rebuilt when they are first used
+        self._pending_rebuild = False
         self._board_stone = [[0] * self._board_size for _ in range(self._board_size)]
         self._stone_array = []
-        self._board_patterns = BoardPattern(self)
+        self._board_patterns = BoardPattern(self, self._shaping)
+        self._board_shapes = BoardShape(self._board_size)
+        self._hash_key = 0
+        self._empty_cells = CellIndex(self._board_size ** 2, range(self._board_size ** 2))
+        # number of stones around every position, the frontier holds the empty ones with at least one
+        self._neighbour_counts = [0] * self._board_size ** 2
+        self._frontier = CellIndex(self._board_size ** 2)
+        self._legal_action_mask[:] = True
 
     def step(self, action):
         """
@@ -32,39 +93,178 @@ class Board(object):
 
         if self._board_state[row][col] != 0:
             raise BoardPositionAlreadyTaken
+        if self._pending_rebuild:
+            self._rebuild()
 
         self._current_step += 1
-        current_stone = Stone(action, self._current_stone_color, self._current_step)
+        current_stone = Stone(action, self._current_stone_color, self._current_step, self._board_patterns)
         self._stone_array.append(current_stone)
 
         self._board_state[row][col] = self._current_stone_color.value
         self._board_stone[row][col] = current_stone
+        self._moves.append(row * self._board_size + col)
+        self._empty_cells.remove(row * self._board_size + col)
+        self._add_to_frontier(row * self._board_size + col)
+        self._legal_action_mask[row * self._board_size + col] = False
         self._board_patterns.add_stone(current_stone)
+        self._board_shapes.add_stone(row * self._board_size + col, self._current_stone_color)
+        self._hash_key ^= self._zobrist_keys[self._current_stone_color][row * self._board_size + col]
         have_five = self._board_patterns.five_stones_found
         is_full = self._current_step >= self._board_size ** 2
         if not(have_five or is_full):
             self._current_stone_color = self._current_stone_color.next()
+            self._hash_key ^= self._zobrist_side_key
 
         return have_five, is_full
 
+    def undo(self):
+        """
+        take back the last stone, restoring the board and its patterns exactly
+        """
+        if self._current_step == 0:
+            raise NoStoneToUndo
+        if self._pending_rebuild:
+            self._rebuild()
+
+        stone = self._stone_array.pop()
+        row, col = stone.position
+        self._moves.pop()
+
+        self._board_patterns.undo()
+        self._board_shapes.remove_stone(row * self._board_size + col, stone.color)
+        self._board_state[row][col] = 0
+        self._board_stone[row][col] = 0
+        self._remove_from_frontier(row * self._board_size + col)
+        self._empty_cells.undo_remove(row * self._board_size + col)
+        self._legal_action_mask[row * self._board_size + col] = True
+        self._hash_key ^= self._zobrist_keys[stone.color][row * self._board_size + col]
+        if self._current_stone_color != stone.color:
+            self._hash_key ^= self._zobrist_side_key
+        self._current_stone_color = stone.color
+        self._current_step -= 1
+
+    @contextlib.contextmanager
+    def push(self, action):
+        """
+        step the board and undo the step when leaving the context, e.g.
+            with board.push([row, col]) as (have_five, is_full):
+                ...
+        :param action: [row, column]
+        """
+        result = self.step(action)
+        try:
+            yield result
+        finally:
+            self.undo()
+
+    def snapshot(self):
+        """
+        :return: BoardSnapshot of the position, a few hundred bytes when pickled
+        """
+        return BoardSnapshot(self._board_size, np.array(self._moves, dtype='<u2').tobytes(),
+                             self._current_stone_color.value)
+
+    def restore(self, snapshot):
+        """
+        set the position of a BoardSnapshot, the board state, hash key and empty positions are set right away,
+        the stones and patterns are rebuilt when they are first used
+        """
+        board_size, moves, color_value = snapshot
+        if board_size != self._board_size:
+            raise ValueError("snapshot of a board of size {}".format(board_size))
+        self.reset()
+        self._moves = np.frombuffer(moves, dtype='<u2').tolist()
+        flat_board_state = self._board_state.reshape(-1)
+        color = StoneColor.black
+        for cell in self._moves:
+            flat_board_state[cell] = color.value
+            self._hash_key ^= self._zobrist_keys[color][cell]
+            self._empty_cells.remove(cell)
+            self._add_to_frontier(cell)
+            self._legal_action_mask[cell] = False
+            color = color.next()
+        self._current_step = len(self._moves)
+        self._current_stone_color = StoneColor(color_value)
+        if self._current_stone_color == StoneColor.white:
+            self._hash_key ^= self._zobrist_side_key
+        self._pending_rebuild = self._current_step > 0
+
+    def clone(self):
+        """
+        :return: copy of the board, only the flat state is copied, the stones and patterns of the copy are
+                 rebuilt when they are first used
+        """
+        board = Board.__new__(Board)
+        board._board_size = self._board_size
+        board._shaping = self._shaping
+        board._zobrist_keys, board._zobrist_side_key = self._zobrist_keys, self._zobrist_side_key
+        board._current_stone_color = self._current_stone_color
+        board._current_step = self._current_step
+        board._allocate_arrays()
+        board._board_state[:] = self._board_state
+        board._legal_action_mask[:] = self._legal_action_mask
+        board._moves = list(self._moves)
+        board._hash_key = self._hash_key
+        board._empty_cells = self._empty_cells.copy()
+        board._frontier_distance, board._neighbours = self._frontier_distance, self._neighbours
+        board._neighbour_counts = list(self._neighbour_counts)
+        board._frontier = self._frontier.copy()
+        board._board_stone = board._stone_array = board._board_patterns = board._board_shapes = None
+        board._rasterizer = None
+        board._pending_rebuild = True
+        if board._current_step == 0:
+            board._rebuild()
+        return board
+
+    def _add_to_frontier(self, cell):
+        """
+        update the frontier for a stone on the empty cell
+        """
+        if self._neighbour_counts[cell] > 0:
+            self._frontier.remove(cell)
+        for neighbour in self._neighbours[cell]:
+            self._neighbour_counts[neighbour] += 1
+            if self._neighbour_counts[neighbour] == 1 and self._flat_board_state[neighbour] == 0:
+                self._frontier.add(neighbour)
+
+    def _remove_from_frontier(self, cell):
+        """
+        revert _add_to_frontier(cell) of the last stone, cell is empty again
+        """
+        for neighbour in reversed(self._neighbours[cell]):
+            self._neighbour_counts[neighbour] -= 1
+            if self._neighbour_counts[neighbour] == 0 and self._flat_board_state[neighbour] == 0:
+                self._frontier.undo_add(neighbour)
+        if self._neighbour_counts[cell] > 0:
+            self._frontier.undo_remove(cell)
+
+    def _rebuild(self):
+        """
+        replay the moves on an empty board to create the stones, patterns and undo history
+        """
+        moves, color = self._moves, self._current_stone_color
+        self.reset()
+        for cell in moves:
+            self.step(divmod(cell, self._board_size))
+        assert self._current_stone_color == color, "the moves do not give the color to move"
+
     def render(self, mode='human'):
         """
-        :param mode: choose render mode
-        :return: figure or rgb_array
+        :param mode: 'human' shows a matplotlib figure,
+                     'rgb_array' returns a (H, W, 3) uint8 frame with the last move marked
+        :return: None or rgb_array
         """
         if mode == 'human':
-            fig = plt.figure(figsize=[8, 8])
-            ax = fig.add_subplot(111, xticks=range(self._board_size), yticks=range(self._board_size),
-                                 position=[.1, .1, .8, .8])
-            ax.grid(color='k', linestyle='-', linewidth=1)
-            ax.xaxis.set_tick_params(bottom='off', top='off', labelbottom='off')
-            ax.yaxis.set_tick_params(left='off', right='off', labelleft='off')
-            for stone in self._stone_array:
-                ax.add_patch(stone.get_mpatches())
-                stone.draw_step_number()
-            plt.show()
+            # imported here, matplotlib is only loaded when a board is rendered
+            from gomoku.render import render_human
+            render_human(self)
+        elif mode == 'rgb_array':
+            if self._rasterizer is None:
+                from gomoku.raster import BoardRasterizer
+                self._rasterizer = BoardRasterizer(self._board_size)
+            return self._rasterizer.render(self._board_state, self.last_move)
         else:
-            pass
+            raise ValueError("unsupported render mode {!r}".format(mode))
 
     def position_exist(self, row, col):
         return 0 <= row < self.board_size and 0 <= col < self.board_size
@@ -77,18 +277,80 @@ class Board(object):
     def board_state(self):
         return self._board_state
 
+    @property
+    def flat_board_state(self):
+        """
+        read-only (board_size ** 2,) int8 view of board_state, updated in place
+        """
+        return self._flat_board_state
+
     @property
     def board_stone(self):
+        if self._pending_rebuild:
+            self._rebuild()
         return self._board_stone
 
     @property
     def stone_array(self):
+        if self._pending_rebuild:
+            self._rebuild()
         return self._stone_array
 
+    @property
+    def last_move(self):
+        """
+        (row, col) of the last stone, None on an empty board
+        """
+        return divmod(self._moves[-1], self._board_size) if len(self._moves) > 0 else None
+
+    @property
+    def empty_cells(self):
+        """
+        CellIndex of the empty positions, row * board_size + col
+        """
+        return self._empty_cells
+
+    @property
+    def frontier(self):
+        """
+        CellIndex of the empty positions at most frontier_distance rows and columns away from a stone,
+        row * board_size + col
+        """
+        return self._frontier
+
+    @property
+    def frontier_distance(self):
+        return self._frontier_distance
+
+    @property
+    def legal_action_mask(self):
+        """
+        read-only (board_size ** 2,) boolean array, True for the empty positions, updated in place
+        """
+        return self._legal_action_mask_view
+
     @property
     def board_patterns(self):
+        if self._pending_rebuild:
+            self._rebuild()
         return self._board_patterns
 
+    @property
+    def board_shapes(self):
+        """
+        BoardShape of the lines through every position, including split threes and fours
+        """
+        if self._pending_rebuild:
+            self._rebuild()
+        return self._board_shapes
+
     @property
     def current_stone_color(self):
         return self._current_stone_color
+
+    @property
+    def hash_key(self):
+        """
+        64-bit Zobrist key of the stones and the color to move
+        """
+        return self._hash_key
@@ -1,6 +1,6 @@
 import enum
-import matplotlib.patches as mpatches
-import matplotlib.pyplot as plt
+import functools
+import random
 
 
 class StoneColor(enum.Enum):
@@ -12,12 +12,17 @@ class StoneColor(enum.Enum):
 
 
 class Stone(object):
-    def __init__(self, position, color, step):
+    __slots__ = ('_position', '_color', '_step', '_board_patterns')
+
+    def __init__(self, position, color, step, board_patterns=None):
+        """
+        :param board_patterns: BoardPattern that keeps the patterns of the stone
+        """
         self._position = position
         assert color == StoneColor.black or color == StoneColor.white, "invalid color type"
         self._color = color
         self._step = step
-        self.patterns = []
+        self._board_patterns = board_patterns
 
     def __repr__(self):
         rep = "Stone "
@@ -27,32 +32,27 @@ class Stone(object):
         return rep
 
     def get_mpatches(self):
-        x, y = self.position
-        facecolor = (0, 0, 0) if self._color == StoneColor.black else (1, 1, 1)
-        radius = 0.45
-        zorder = 10
-        return mpatches.Circle((x, y), radius, facecolor=facecolor, edgecolor=(0, 0, 0), linewidth=1, clip_on=False,
-                               zorder=zorder)
+        # imported here, matplotlib is only loaded when a board is rendered
+        from gomoku.render import stone_patch
+        return stone_patch(self)
 
     def draw_step_number(self):
-        x, y = self.position
-        color = (1, 1, 1) if self._color == StoneColor.black else (0, 0, 0)
-        plt.text(x, y, str(self._step), size=15, color=color, ha="center", va="center", zorder=20)
-
-    def get_pattern(self, orientation):
-        pattern_any = 0
-        for pattern in self.patterns:
-            if pattern.orientation == orientation:
-                return pattern
-            elif pattern.orientation == Orientation.any:
-                pattern_any = pattern
-                break
-        if pattern_any == 0:
-            pattern = Pattern(self)
-        else:
-            pattern = pattern_any
-        pattern.orientation = orientation
-        return pattern
+        from gomoku.render import draw_step_number
+        draw_step_number(self)
+
+    def find_pattern(self, orientation):
+        """
+        :return: the pattern of the stone along the orientation, None if there is no such pattern
+        """
+        if self._board_patterns is None:
+            return None
+        return self._board_patterns.find_pattern(self, orientation)
+
+    @property
+    def patterns(self):
+        if self._board_patterns is None:
+            return []
+        return self._board_patterns.stone_patterns(self)
 
     # def __eq__(self, other):
     #     if isinstance(other, Stone):
@@ -85,6 +85,15 @@ class Orientation(enum.Enum):
     right_diagonal = "right_diagonal"
 
 
+# slot of each orientation in the pattern table of BoardPattern
+Orientation_slot = {
+    Orientation.any: 0,
+    Orientation.horizontal: 1,
+    Orientation.vertical: 2,
+    Orientation.left_diagonal: 3,
+    Orientation.right_diagonal: 4
+}
+
 Orientation_dictionary = {
     Orientation.horizontal: [[-1, 0], [1, 0]],
     Orientation.vertical: [[0, -1], [0, 1]],
@@ -93,29 +102,117 @@ Orientation_dictionary = {
 }
 
 
-class StoneArray(list):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+# fixed seed, the keys are the same in every process so hashes can be shared and stored
+ZOBRIST_SEED = 20201015
+
+
+@functools.lru_cache()
+def zobrist_keys(board_size):
+    """
+    :return: (keys, side_key), keys[color][row * board_size + col] is the random 64-bit key of a stone,
+             side_key is xor-ed in when white is to move
+    """
+    rng = random.Random(ZOBRIST_SEED + board_size)
+    keys = {color: [rng.getrandbits(64) for _ in range(board_size ** 2)]
+            for color in [StoneColor.black, StoneColor.white]}
+    return keys, rng.getrandbits(64)
+
+
+class CellIndex(object):
+    """
+    Set of cell ids (row * board_size + col) with O(1) add, remove and random choice.
+    The cells are kept in a list, a removed cell is swapped with the last one and slots maps every cell
+    to its position. Undoing the changes in reverse order restores the exact order of the cells.
+    """
+    def __init__(self, number_of_cells, cells=()):
+        self._cells = list(cells)
+        self._slots = [0] * number_of_cells
+        for slot, cell in enumerate(self._cells):
+            self._slots[cell] = slot
+
+    def add(self, cell):
+        self._slots[cell] = len(self._cells)
+        self._cells.append(cell)
+
+    def remove(self, cell):
+        # the slot of the removed cell is kept for undo_remove()
+        slot = self._slots[cell]
+        last = self._cells.pop()
+        if last != cell:
+            self._cells[slot] = last
+            self._slots[last] = slot
+
+    def undo_add(self, cell):
+        assert self._cells[-1] == cell, "changes must be undone in reverse order"
+        self._cells.pop()
+
+    def undo_remove(self, cell):
+        slot = self._slots[cell]
+        if slot < len(self._cells):
+            moved = self._cells[slot]
+            self._slots[moved] = len(self._cells)
+            self._cells.append(moved)
+            self._cells[slot] = cell
+        else:
+            self._cells.append(cell)
+
+    def choice(self, rng=random):
+        return self._cells[rng.randrange(len(self._cells))]
+
+    def copy(self):
+        cell_index = CellIndex.__new__(CellIndex)
+        cell_index._cells = list(self._cells)
+        cell_index._slots = list(self._slots)
+        return cell_index
+
+    def __contains__(self, cell):
+        slot = self._slots[cell]
+        return slot < len(self._cells) and self._cells[slot] == cell
 
-    def append(self, val):
-        index = 0
-        for item in self:
-            if val < item:
-                break
-            index += 1
-        self.insert(index, val)
+    def __iter__(self):
+        return iter(self._cells)
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __repr__(self):
+        return "CellIndex " + repr(self._cells)
+
+
+# step from the min stone to the max stone of a pattern, stones are ordered by (row, col)
+Orientation_step = {
+    Orientation.horizontal: (1, 0),
+    Orientation.vertical: (0, 1),
+    Orientation.left_diagonal: (1, -1),
+    Orientation.right_diagonal: (1, 1)
+}
 
 
 class Pattern(object):
-    def __init__(self, stone):
+    """
+    Run of stones of one color along an orientation, stored as the position of its min stone and the
+    number of stones, the stones are looked up on the board.
+    """
+    __slots__ = ('_color', '_board_stone', 'orientation', 'min_position', 'number_of_stones',
+                 'min_stone_free', 'max_stone_free', 'index_key', 'index_order')
+
+    def __init__(self, stone, board_stone, orientation=Orientation.any):
+        """
+        :param board_stone: Board.board_stone, the stones of the pattern are read from it
+        """
         self._color = stone.color
-        self.orientation = Orientation.any
-        self.stones = StoneArray([stone])
+        self._board_stone = board_stone
+        self.orientation = orientation
+        self.min_position = tuple(stone.position)
+        self.number_of_stones = 1
 
         self.min_stone_free = True
         self.max_stone_free = True
 
-        stone.patterns.append(self)
+        # sort key of the bucket of BoardPattern that holds the pattern, None if it is in no bucket,
+        # and its order in the bucket
+        self.index_key = None
+        self.index_order = 0
 
     def end_stones_next_position(self, board):
         min_stone, max_stone = self.end_stones
@@ -156,54 +253,228 @@ class Pattern(object):
         return self._color
 
     @property
-    def number_of_stones(self):
-        return len(self.stones)
+    def stones(self):
+        """
+        :return: the stones ordered by position
+        """
+        row, col = self.min_position
+        if self.number_of_stones == 1:
+            return [self._board_stone[row][col]]
+        dr, dc = Orientation_step[self.orientation]
+        return [self._board_stone[row + k * dr][col + k * dc] for k in range(self.number_of_stones)]
+
+    @property
+    def max_position(self):
+        if self.number_of_stones == 1:
+            return self.min_position
+        row, col = self.min_position
+        dr, dc = Orientation_step[self.orientation]
+        return row + (self.number_of_stones - 1) * dr, col + (self.number_of_stones - 1) * dc
 
     @property
     def end_stones(self):
-        return self.stones[0], self.stones[-1]
+        (min_row, min_col), (max_row, max_col) = self.min_position, self.max_position
+        return self._board_stone[min_row][min_col], self._board_stone[max_row][max_col]
 
     @property
     def free_end_number(self):
         return int(self.max_stone_free) + int(self.min_stone_free)
 
 
-def _update_pattern_along_orientation(existing_stone, orientation, stone, patterns):
-    pattern = existing_stone.get_pattern(orientation)
-    if pattern not in patterns:
-        patterns.append(pattern)
-    pattern.stones.append(stone)
-    stone.patterns.append(pattern)
+def stone_count_squared(number_of_stones, free_end_number):
+    """
+    default shaping of a pattern
+    """
+    return number_of_stones ** 2
+
+
+def _pattern_sort_key(pattern):
+    # ascending key of the descending order given by Pattern.__lt__
+    return pattern.free_end_number == 0, -pattern.number_of_stones, -pattern.free_end_number
+
+
+def _index_order(pattern):
+    return pattern.index_order
+
+
+# journal entries, each one records how to revert a single change
+_INSERTED = 0
+_ATTRIBUTE_SET = 1
+_ITEM_SET = 2
+
+
+def _revert(journal):
+    for entry in reversed(journal):
+        if entry[0] == _INSERTED:
+            _, items, index = entry
+            del items[index]
+        elif entry[0] == _ATTRIBUTE_SET:
+            _, obj, name, value = entry
+            setattr(obj, name, value)
+        else:
+            _, items, index, item = entry
+            items[index] = item
+
+
+class _PatternBuckets(object):
+    """
+    Patterns of one color in buckets by _pattern_sort_key. A pattern is placed at the front or the back of
+    its bucket with an order number below or above the others, so that adding and removing a pattern takes
+    O(1) and the sorted list is only built when it is read.
+    """
+    __slots__ = ('buckets', 'created', 'view')
+
+    def __init__(self):
+        # sort key -> {pattern: None}
+        self.buckets = {}
+        # patterns created by the current add_stone(), put in the buckets by _sort_patterns()
+        self.created = []
+        # sorted list of the patterns, None after a change
+        self.view = None
+
+    def __contains__(self, pattern):
+        return pattern.index_key is not None or pattern in self.created
+
+    def patterns(self):
+        if self.view is None:
+            self.view = [pattern for key in sorted(self.buckets)
+                         for pattern in sorted(self.buckets[key], key=_index_order)]
+        return self.view
 
 
 class BoardPattern(object):
-    def __init__(self, board):
-        self._black_stone_patterns = []
-        self._white_stone_patterns = []
+    def __init__(self, board, shaping=stone_count_squared):
+        """
+        :param shaping: shaping(number_of_stones, free_end_number), value of a pattern, the sum over the
+                        patterns of each color is kept up to date by add_stone() and undo()
+        """
+        # black and white patterns
+        self._pattern_buckets = [_PatternBuckets(), _PatternBuckets()]
+        # order numbers given to the patterns placed at the front and at the back of a bucket
+        self._front_order = 0
+        self._back_order = 0
         self._board = board
+        self._five_stones_found = False
+        # pattern of every position along every orientation, (row * board_size + col) * 5 + Orientation_slot,
+        # None if the position has no such pattern
+        self._pattern_table = [None] * (board.board_size ** 2 * len(Orientation_slot))
+        # one journal per added stone, every change made to the patterns, the pattern lists and
+        # the stones is recorded so that undo() restores them exactly
+        self._history = []
+        self._journal = None
+        self._shaping = shaping
+        # [black, white] sum of shaping over the patterns and its change made by the last add_stone()
+        self._shaping_totals = [0, 0]
+        self._shaping_deltas = [0, 0]
 
     def add_stone(self, stone):
-        patterns = self._black_stone_patterns if stone.color == StoneColor.black else self._white_stone_patterns
+        self._journal = []
+        self._history.append(self._journal)
+        shaping_before = self._shaping_around(stone)
         if not self._check_existing_patterns(stone):
-            patterns.append(Pattern(stone))
-        self._update_patterns_end_free()
-        self._sort_patterns()
-
-    def _update_patterns_end_free(self):
-        for pattern in self.white_stone_patterns + self.black_stone_patterns:
+            self._buckets(stone.color).created.append(self._new_pattern(stone))
+        changed_patterns = self._update_patterns_end_free(stone)
+        self._sort_patterns(changed_patterns)
+        for pattern in stone.patterns:
+            if pattern.number_of_stones >= 5:
+                self._set(self, '_five_stones_found', True)
+        for index, (before, after) in enumerate(zip(shaping_before, self._shaping_around(stone))):
+            self._set_item(self._shaping_deltas, index, after - before)
+            self._set_item(self._shaping_totals, index, self._shaping_totals[index] + after - before)
+
+    def undo(self):
+        """
+        revert the last add_stone(), in time proportional to the changes it made
+        """
+        _revert(self._history.pop())
+        self._journal = None
+        for buckets in self._pattern_buckets:
+            buckets.view = None
+
+    def find_pattern(self, stone, orientation):
+        """
+        :return: the pattern of the stone along the orientation, None if there is no such pattern
+        """
+        return self._pattern_table[self._slot(stone, orientation)]
+
+    def stone_patterns(self, stone):
+        """
+        :return: the patterns of the stone, in Orientation_slot order
+        """
+        start = self._slot(stone, Orientation.any)
+        return [pattern for pattern in self._pattern_table[start:start + len(Orientation_slot)]
+                if pattern is not None]
+
+    def shaping_total(self, color):
+        """
+        :return: sum of shaping over the patterns of the color
+        """
+        return self._shaping_totals[0 if color == StoneColor.black else 1]
+
+    def shaping_delta(self, color):
+        """
+        :return: change of shaping_total(color) made by the last added stone
+        """
+        return self._shaping_deltas[0 if color == StoneColor.black else 1]
+
+    def _shaping_around(self, stone):
+        """
+        a stone only creates, extends, merges or changes the free ends of the patterns of its position and of
+        the 8 positions next to it
+        :return: [black, white] sum of shaping over these patterns
+        """
+        row, col = stone.position
+        board_size = self._board.board_size
+        number_of_slots = len(Orientation_slot)
+        patterns = {}
+        for r in range(max(row - 1, 0), min(row + 2, board_size)):
+            start = (r * board_size + max(col - 1, 0)) * number_of_slots
+            end = (r * board_size + min(col + 2, board_size)) * number_of_slots
+            for pattern in self._pattern_table[start:end]:
+                if pattern is not None:
+                    patterns[id(pattern)] = pattern
+        totals = [0, 0]
+        for pattern in patterns.values():
+            totals[0 if pattern.color == StoneColor.black else 1] += \
+                self._shaping(pattern.number_of_stones, pattern.free_end_number)
+        return totals
+
+    def _slot(self, stone, orientation):
+        row, col = stone.position
+        return (row * self._board.board_size + col) * len(Orientation_slot) + Orientation_slot[orientation]
+
+    def _update_patterns_end_free(self, stone):
+        """
+        only the patterns of the new stone and the patterns ending next to it can change
+        :return: the patterns that might have changed
+        """
+        changed_patterns = list(stone.patterns)
+        row, col = stone.position
+        for orientation, offsets in Orientation_dictionary.items():
+            for dr, dc in offsets:
+                if self._board.position_exist(row + dr, col + dc):
+                    neighbour = self._board.board_stone[row + dr][col + dc]
+                    if neighbour != 0 and neighbour.color != stone.color:
+                        pattern = neighbour.find_pattern(orientation)
+                        if pattern is not None:
+                            changed_patterns.append(pattern)
+        for pattern in changed_patterns:
             if pattern.orientation != Orientation.any:
                 min_stone_next_pos, max_stone_next_pos = pattern.end_stones_next_position(self._board)
-                pattern.min_stone_free = pattern.min_stone_free and min_stone_next_pos is not None
-                pattern.max_stone_free = pattern.max_stone_free and max_stone_next_pos is not None
-                if pattern.min_stone_free:
+                min_stone_free = pattern.min_stone_free and min_stone_next_pos is not None
+                max_stone_free = pattern.max_stone_free and max_stone_next_pos is not None
+                if min_stone_free:
                     min_row, min_col = min_stone_next_pos
-                    pattern.min_stone_free = self._board.board_state[min_row][min_col] == 0
-                if pattern.max_stone_free:
+                    min_stone_free = self._board.board_state[min_row][min_col] == 0
+                if max_stone_free:
                     max_row, max_col = max_stone_next_pos
-                    pattern.max_stone_free = self._board.board_state[max_row][max_col] == 0
+                    max_stone_free = self._board.board_state[max_row][max_col] == 0
+                self._set(pattern, 'min_stone_free', min_stone_free)
+                self._set(pattern, 'max_stone_free', max_stone_free)
+        return changed_patterns
 
     def _check_existing_patterns(self, stone):
-        patterns = self._black_stone_patterns if stone.color == StoneColor.black else self._white_stone_patterns
+        patterns = self._buckets(stone.color)
         match_h = self._check_orientation(stone, Orientation.horizontal, [-1, 0], [1, 0], patterns)
         match_v = self._check_orientation(stone, Orientation.vertical, [0, 1], [0, -1], patterns)
         match_ld = self._check_orientation(stone, Orientation.left_diagonal, [-1, 1], [1, -1], patterns)
@@ -222,31 +493,64 @@ class BoardPattern(object):
             o1_stone = self._board.board_stone[row + o1_dr][col + o1_dc]
             if o2_stone_is_same_color:
                 o2_stone = self._board.board_stone[row + o2_dr][col + o2_dc]
-                o1_pattern = o1_stone.get_pattern(orientation)
-                # add o1_pattern if not in patterns, can happen if the o1_happen is newly created in get_pattern()
+                o1_pattern = self._get_pattern(o1_stone, orientation)
+                # add o1_pattern if not in patterns, can happen if the o1_happen is newly created in _get_pattern()
                 if o1_pattern not in patterns:
-                    patterns.append(o1_pattern)
-                o2_pattern = o2_stone.get_pattern(orientation)
-                o1_pattern.stones.append(stone)
-                stone.patterns.append(o1_pattern)
-                for stone in o2_pattern.stones:
-                    # add stones form Orientation 2 to Orientation 1
-                    o1_pattern.stones.append(stone)
-                    # remove o2_pattern reference
-                    stone.patterns.remove(o2_pattern)
-                    stone.patterns.append(o1_pattern)
+                    patterns.created.append(o1_pattern)
+                o2_pattern = self._get_pattern(o2_stone, orientation)
+                self._add_to_pattern(o1_pattern, stone)
+                # add the interval of Orientation 2 to Orientation 1
+                self._set(o1_pattern, 'min_position', min(o1_pattern.min_position, o2_pattern.min_position))
+                self._set(o1_pattern, 'number_of_stones', o1_pattern.number_of_stones + o2_pattern.number_of_stones)
+                for o2_pattern_stone in o2_pattern.stones:
+                    # replace o2_pattern reference
+                    self._set_item(self._pattern_table, self._slot(o2_pattern_stone, orientation), o1_pattern)
                 if o2_pattern in patterns:
-                    patterns.remove(o2_pattern)
+                    self._unindex(patterns, o2_pattern)
             else:
-                _update_pattern_along_orientation(o1_stone, orientation, stone, patterns)
+                self._update_pattern_along_orientation(o1_stone, orientation, stone, patterns)
         else:
             if o2_stone_is_same_color:
                 o2_stone = self._board.board_stone[row + o2_dr][col + o2_dc]
-                _update_pattern_along_orientation(o2_stone, orientation, stone, patterns)
+                self._update_pattern_along_orientation(o2_stone, orientation, stone, patterns)
             else:
                 found = False
         return found
 
+    def _update_pattern_along_orientation(self, existing_stone, orientation, stone, patterns):
+        pattern = self._get_pattern(existing_stone, orientation)
+        if pattern not in patterns:
+            patterns.created.append(pattern)
+        self._add_to_pattern(pattern, stone)
+
+    def _get_pattern(self, stone, orientation):
+        """
+        :return: the pattern of the stone along the orientation, the single stone pattern of the stone
+                 or a new pattern is given the orientation if the stone has none along it
+        """
+        pattern = self.find_pattern(stone, orientation)
+        if pattern is None:
+            pattern = self.find_pattern(stone, Orientation.any)
+            if pattern is not None:
+                # the single stone pattern is given the orientation
+                self._set_item(self._pattern_table, self._slot(stone, Orientation.any), None)
+                self._set_item(self._pattern_table, self._slot(stone, orientation), pattern)
+                self._set(pattern, 'orientation', orientation)
+        if pattern is None:
+            pattern = self._new_pattern(stone, orientation)
+        return pattern
+
+    def _new_pattern(self, stone, orientation=Orientation.any):
+        pattern = Pattern(stone, self._board.board_stone, orientation)
+        self._set_item(self._pattern_table, self._slot(stone, orientation), pattern)
+        return pattern
+
+    def _add_to_pattern(self, pattern, stone):
+        # the stone is next to one of the end stones
+        self._set(pattern, 'min_position', min(pattern.min_position, tuple(stone.position)))
+        self._set(pattern, 'number_of_stones', pattern.number_of_stones + 1)
+        self._set_item(self._pattern_table, self._slot(stone, pattern.orientation), pattern)
+
     def _check_dr_dc(self, color, row, col, dr, dc):
         row += dr
         col += dc
@@ -259,9 +563,64 @@ class BoardPattern(object):
         else:
             return False
 
-    def _sort_patterns(self):
-        self._black_stone_patterns.sort(reverse=True)
-        self._white_stone_patterns.sort(reverse=True)
+    def _sort_patterns(self, changed_patterns):
+        """
+        Give the order of a stable sort of the pattern lists, with O(1) bucket changes per changed pattern.
+        A pattern keeps its place among the equal patterns if its key is unchanged, goes to the front of
+        its new bucket if the key moved it down the list and to the back if the key moved it up, the
+        created patterns are after all the others.
+        """
+        for color in [StoneColor.black, StoneColor.white]:
+            buckets = self._buckets(color)
+            to_front, to_back = {}, {}
+            for pattern in changed_patterns:
+                if pattern.color != color or pattern.index_key is None:
+                    continue
+                if _pattern_sort_key(pattern) != pattern.index_key:
+                    moved = to_front if _pattern_sort_key(pattern) > pattern.index_key else to_back
+                    # keyed by the place in the list before the change
+                    moved[(pattern.index_key, pattern.index_order)] = pattern
+                    self._unindex(buckets, pattern)
+            # the first one of the list ends up in front
+            for place in sorted(to_front, reverse=True):
+                self._index(buckets, to_front[place], front=True)
+            for pattern in [to_back[place] for place in sorted(to_back)] + buckets.created:
+                self._index(buckets, pattern, front=False)
+            buckets.created = []
+
+    def _buckets(self, color):
+        return self._pattern_buckets[0 if color == StoneColor.black else 1]
+
+    def _index(self, buckets, pattern, front):
+        key = _pattern_sort_key(pattern)
+        if front:
+            self._front_order -= 1
+            order = self._front_order
+        else:
+            self._back_order += 1
+            order = self._back_order
+        bucket = buckets.buckets.setdefault(key, {})
+        bucket[pattern] = None
+        self._journal.append((_INSERTED, bucket, pattern))
+        self._set(pattern, 'index_key', key)
+        self._set(pattern, 'index_order', order)
+        buckets.view = None
+
+    def _unindex(self, buckets, pattern):
+        bucket = buckets.buckets[pattern.index_key]
+        self._journal.append((_ITEM_SET, bucket, pattern, None))
+        del bucket[pattern]
+        self._set(pattern, 'index_key', None)
+        buckets.view = None
+
+    def _set_item(self, items, index, item):
+        self._journal.append((_ITEM_SET, items, index, items[index]))
+        items[index] = item
+
+    def _set(self, obj, name, value):
+        if getattr(obj, name) != value:
+            self._journal.append((_ATTRIBUTE_SET, obj, name, getattr(obj, name)))
+            setattr(obj, name, value)
 
     def __repr__(self):
         rep = repr(self.black_stone_patterns)
@@ -271,22 +630,15 @@ class BoardPattern(object):
 
     @property
     def black_stone_patterns(self):
-        return self._black_stone_patterns
+        """
+        black patterns, the longest one with a free end first, built again after a change, do not modify it
+        """
+        return self._pattern_buckets[0].patterns()
 
     @property
     def white_stone_patterns(self):
-        return self._white_stone_patterns
+        return self._pattern_buckets[1].patterns()
 
     @property
     def five_stones_found(self):
-        if len(self._white_stone_patterns) == 0:
-            return False
-        else:
-            # need to go through the patterns, as the five stone can be blocked
-            # in two side and got sorted to the last
-            for black_pattern, white_pattern in \
-                    zip(self._black_stone_patterns, self._white_stone_patterns):
-                if black_pattern.number_of_stones >= 5 \
-                        or white_pattern.number_of_stones >= 5:
-                    return True
-            return False
+        return self._five_stones_found
@@ -2,40 +2,70 @@ import gym
 from gym import spaces
 import numpy as np
 from gomoku.envs.board import Board, BoardPositionAlreadyTaken
-from gomoku.envs.boardUtils import StoneColor
+from gomoku.envs.boardUtils import StoneColor, stone_count_squared
+from gomoku.envs.observation import PlaneObservation
 from gomoku.envs.opponent import EasyAgent
 
 
-def _black_stone_reward_from_patterns(patterns, patterns_color):
-    reward = 0
-    for pattern in patterns:
-        reward += pattern.number_of_stones ** 2
-    return reward if patterns_color == StoneColor.black else -reward
-
-
 class GomokuEnv(gym.Env):
+    metadata = {'render_modes': ['human', 'rgb_array']}
+
     def __init__(self, board_size=15,
                  opponent_class=EasyAgent,
-                 randomness=True):
+                 randomness=True,
+                 observation_mode='flat',
+                 history=1,
+                 shaping=stone_count_squared):
+        """
+        :param shaping: shaping(number_of_stones, free_end_number), the step reward adds its sum over the
+                        black patterns
+        :param observation_mode: 'flat', board_state as a (board_size ** 2,) int8 array
+                                 'planes', PlaneObservation of the black stones with history last moves
+        observations are read-only views updated in place by the next step, copy them to keep them
+        """
         self._board_size = board_size
-        self._board = Board(board_size)
+        self._board = Board(board_size, shaping)
 
         # opponent uses white stone
         self.opponent = opponent_class(self._board, StoneColor.white, randomness)
 
         self.action_space = spaces.Discrete(board_size ** 2)
         # self.action_space = spaces.MultiDiscrete([board_size, board_size])
-        self.observation_space = spaces.Box(-1, 1, (board_size**2,), dtype=np.int8)
+        if observation_mode == 'flat':
+            self._planes = None
+            self.observation_space = spaces.Box(-1, 1, (board_size**2,), dtype=np.int8)
+        elif observation_mode == 'planes':
+            self._planes = PlaneObservation(board_size, StoneColor.black, history)
+            self.observation_space = spaces.Box(0, 1, self._planes.shape, dtype=np.int8)
+        else:
+            raise ValueError("unsupported observation mode {!r}".format(observation_mode))
 
     def reset(self):
         self._board.reset()
+        if self._planes is not None:
+            self._planes.reset()
         return self._get_obs()
 
     def _get_obs(self):
-        return self._board.board_state.flatten()
+        if self._planes is not None:
+            return self._planes.planes
+        return self._board.flat_board_state
+
+    def _board_step(self, action):
+        color = self._board.current_stone_color
+        have_five, is_full = self._board.step(action)
+        if self._planes is not None:
+            self._planes.add_move(action[0], action[1], color, self._board.current_stone_color)
+        return have_five, is_full
+
+    def action_masks(self):
+        """
+        :return: boolean array over the actions, True for the empty positions, as used by sb3-contrib MaskablePPO
+        """
+        return self._board.legal_action_mask.copy()
 
     def render(self, mode='human'):
-        self._board.render(mode)
+        return self._board.render(mode)
 
     def step(self, action):
         """
@@ -44,7 +74,6 @@ class GomokuEnv(gym.Env):
         :return: observation, reward, done, information
         """
         reward = 0
-        info = {}
 
         if isinstance(action, int) or isinstance(action, np.int64):
             row = action // self._board_size
@@ -54,25 +83,28 @@ class GomokuEnv(gym.Env):
             row, col = action
 
         try:
-            have_five, is_full = self._board.step(action)
+            have_five, is_full = self._board_step(action)
         except BoardPositionAlreadyTaken:
             # punish invalid action, i.e. put stone on other stones
             # end env after such action
-            return self._get_obs(), -1000, True, info
+            return self._get_obs(), -1000, True, self._get_info()
 
         reward += 1000 if have_five else 0
 
-        # reward actions that link the stones
-        reward += _black_stone_reward_from_patterns(self._board.board_patterns.black_stone_patterns, StoneColor.black)
+        # reward actions that link the stones, the sum is kept up to date by the patterns
+        reward += self._board.board_patterns.shaping_total(StoneColor.black)
 
         if not (have_five or is_full):
             opponent_action, _ = self.opponent.predict(self._get_obs())
-            have_five, is_full = self._board.step(opponent_action)
+            have_five, is_full = self._board_step(opponent_action)
             reward -= 1000 if have_five else 0
 
         done = have_five or is_full
 
-        return self._get_obs(), reward, done, info
+        return self._get_obs(), reward, done, self._get_info()
+
+    def _get_info(self):
+        return {"action_mask": self.action_masks()}
 
     @property
     def board_size(self):
@@ -81,3 +113,4 @@ class GomokuEnv(gym.Env):
     @property
     def board(self):
         return self._board
+
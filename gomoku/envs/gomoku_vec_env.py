@@ -0,0 +1,174 @@
+from gym import spaces
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+# line directions as [row, column] offsets
+DIRECTIONS = [[0, 1], [1, 0], [1, 1], [1, -1]]
+
+
+def _shift(stones, dr, dc, distance):
+    """
+    :param stones: (N, n, n) boolean array
+    :return: array whose [:, r, c] entry is stones[:, r + distance * dr, c + distance * dc],
+             False if that position is outside the board
+    """
+    n = stones.shape[-1]
+    rs, cs = distance * dr, distance * dc
+    shifted = np.zeros_like(stones)
+    shifted[:, max(0, -rs):n - max(0, rs), max(0, -cs):n - max(0, cs)] = \
+        stones[:, max(0, rs):n - max(0, -rs), max(0, cs):n - max(0, -cs)]
+    return shifted
+
+
+def five_in_a_row(stones):
+    """
+    :param stones: (N, n, n) boolean array of the stones of one color
+    :return: (N,) boolean array, True if the board has five (or more) stones in a row
+    """
+    found = np.zeros(stones.shape[0], dtype=bool)
+    window = stones.astype(np.int8)
+    for dr, dc in DIRECTIONS:
+        # sliding window sum of five consecutive cells along the direction
+        window_sum = window.copy()
+        for distance in range(1, 5):
+            window_sum += _shift(window, dr, dc, distance)
+        found |= (window_sum == 5).any(axis=(1, 2))
+    return found
+
+
+def pattern_reward(stones):
+    """
+    Vectorized equivalent of summing number_of_stones ** 2 over the BoardPattern patterns of one color:
+    every run of two or more stones along a direction counts its length squared, every stone
+    without a neighbour of the same color counts one.
+    :param stones: (N, n, n) boolean array of the stones of one color
+    :return: (N,) int array
+    """
+    reward = np.zeros(stones.shape[0], dtype=np.int64)
+    neighbours = np.zeros(stones.shape, dtype=bool)
+    for dr, dc in DIRECTIONS:
+        neighbours |= _shift(stones, dr, dc, 1) | _shift(stones, -dr, -dc, 1)
+        # windows[m] counts the runs of m + 1 consecutive stones, a run of L stones has L - m of them,
+        # sum over runs of length >= 2 of L ** 2 is 2 * sum(c_m for m >= 2) + 2 * c_2 - c_3
+        window = stones & _shift(stones, dr, dc, 1)
+        c_2 = window.sum(axis=(1, 2))
+        c_3 = np.zeros_like(c_2)
+        total = np.zeros_like(c_2)
+        distance = 1
+        while window.any():
+            count = window.sum(axis=(1, 2))
+            if distance == 2:
+                c_3 = count
+            total += count
+            distance += 1
+            window = window & _shift(stones, dr, dc, distance)
+        reward += 2 * total + 2 * c_2 - c_3
+    reward += (stones & ~neighbours).sum(axis=(1, 2))
+    return reward
+
+
+class GomokuVecEnv(VecEnv):
+    """
+    N Gomoku boards stepped together with numpy.
+
+    The agent plays black on every board and the opponent answers with a random empty position.
+    Finished boards are reset automatically, the last observation is kept in info["terminal_observation"].
+    """
+    def __init__(self, num_envs, board_size=15, seed=None):
+        self._board_size = board_size
+        self._boards = np.zeros((num_envs, board_size, board_size), dtype=np.int8)
+        self._rng = np.random.default_rng(seed)
+        self._actions = None
+        self.render_mode = None
+
+        observation_space = spaces.Box(-1, 1, (board_size ** 2,), dtype=np.int8)
+        action_space = spaces.Discrete(board_size ** 2)
+        VecEnv.__init__(self, num_envs, observation_space, action_space)
+
+    def reset(self):
+        self._boards[:] = 0
+        return self._get_obs()
+
+    def action_masks(self):
+        """
+        :return: (N, board_size ** 2) boolean array, True for the empty positions, read from boards so that
+                 the two always agree
+        """
+        return self._boards.reshape(self.num_envs, -1) == 0
+
+    def _get_obs(self):
+        return self._boards.reshape(self.num_envs, -1).copy()
+
+    def step_async(self, actions):
+        self._actions = actions
+
+    def step_wait(self):
+        actions = np.asarray(self._actions).reshape(self.num_envs)
+        self._actions = None
+        envs = np.arange(self.num_envs)
+        flat_boards = self._boards.reshape(self.num_envs, -1)
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+
+        # punish invalid action, i.e. put stone on other stones, end env after such action
+        invalid = flat_boards[envs, actions] != 0
+        valid = ~invalid
+        flat_boards[envs[valid], actions[valid]] = 1
+        empty = flat_boards == 0
+
+        black_stones = self._boards == 1
+        black_five = five_in_a_row(black_stones) & valid
+        rewards[black_five] += 1000
+        # reward actions that link the stones
+        rewards[valid] += pattern_reward(black_stones[valid])
+
+        is_full = ~empty.any(axis=1)
+        opponent_envs = envs[valid & ~black_five & ~is_full]
+        # opponent picks a random empty position
+        scores = self._rng.random((len(opponent_envs), flat_boards.shape[1]))
+        scores[~empty[opponent_envs]] = -1
+        opponent_actions = scores.argmax(axis=1)
+        flat_boards[opponent_envs, opponent_actions] = -1
+        empty[opponent_envs, opponent_actions] = False
+
+        white_five = np.zeros(self.num_envs, dtype=bool)
+        white_five[opponent_envs] = five_in_a_row(self._boards[opponent_envs] == -1)
+        rewards[white_five] -= 1000
+        rewards[invalid] = -1000
+
+        is_full = ~empty.any(axis=1)
+        dones = invalid | black_five | white_five | is_full
+
+        infos = [{} for _ in range(self.num_envs)]
+        for env in envs[dones]:
+            infos[env]["terminal_observation"] = flat_boards[env].copy()
+        self._boards[dones] = 0
+
+        return self._get_obs(), rewards, dones, infos
+
+    def close(self):
+        pass
+
+    def seed(self, seed=None):
+        self._rng = np.random.default_rng(seed)
+        return [seed] * self.num_envs
+
+    def get_attr(self, attr_name, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
+
+    @property
+    def board_size(self):
+        return self._board_size
+
+    @property
+    def boards(self):
+        return self._boards
@@ -0,0 +1,54 @@
+import numpy as np
+from gomoku.envs.boardUtils import StoneColor
+
+# plane order of PlaneObservation, followed by one plane per remembered move, the last move first
+OWN_STONES, OPPONENT_STONES, SIDE_TO_MOVE, LAST_MOVES = 0, 1, 2, 3
+
+
+class PlaneObservation(object):
+    """
+    Multi-plane encoding of a board from the view of one color, updated in place move by move:
+    own stones, opponent stones, side to move (all ones when the color is to move) and the positions of
+    the last history moves.
+    """
+    def __init__(self, board_size=15, color=StoneColor.black, history=1):
+        self._board_size = board_size
+        self._color = color
+        self._history = history
+        self._planes = np.zeros((LAST_MOVES + history, board_size, board_size), dtype=np.int8)
+        self._planes_view = self._planes.view()
+        self._planes_view.setflags(write=False)
+        self._last_moves = []
+        self.reset()
+
+    def reset(self):
+        self._planes[:] = 0
+        self._planes[SIDE_TO_MOVE] = 1 if self._color == StoneColor.black else 0
+        self._last_moves = []
+
+    def add_move(self, row, col, color, next_color):
+        """
+        :param color: color of the stone played at (row, col)
+        :param next_color: color to move after it
+        """
+        self._planes[OWN_STONES if color == self._color else OPPONENT_STONES, row, col] = 1
+        # shift the remembered moves by one plane, only their positions change
+        for index, (last_row, last_col) in enumerate(self._last_moves):
+            self._planes[LAST_MOVES + index, last_row, last_col] = 0
+        self._last_moves = ([(row, col)] + self._last_moves)[:self._history]
+        for index, (last_row, last_col) in enumerate(self._last_moves):
+            self._planes[LAST_MOVES + index, last_row, last_col] = 1
+        to_move = 1 if next_color == self._color else 0
+        if self._planes[SIDE_TO_MOVE, 0, 0] != to_move:
+            self._planes[SIDE_TO_MOVE] = to_move
+
+    @property
+    def planes(self):
+        """
+        read-only (3 + history, board_size, board_size) int8 array, updated in place
+        """
+        return self._planes_view
+
+    @property
+    def shape(self):
+        return self._planes.shape
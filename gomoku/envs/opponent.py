@@ -1,5 +1,11 @@
+import collections
+import math
 import random
+import time
+import numpy as np
+from gomoku.envs.bitboard import BitBoard
 from gomoku.envs.boardUtils import StoneColor, Orientation
+from gomoku.envs.shape import Shape
 
 
 class Agent(object):
@@ -18,16 +24,12 @@ class RandomAgent(Agent):
         Agent.__init__(self, board, stone_color, randomness)
 
     def predict(self, obs=None):
-        not_found = True
-        # Optimize
-        while not_found:
-            row = self._random_rc()
-            col = self._random_rc()
-            not_found = self._board.board_state[row][col] != 0
+        row, col = divmod(self._board.empty_cells.choice(), self._board.board_size)
         return [row, col], None
 
-    def _random_rc(self):
-        return random.randint(0, self._board.board_size - 1)
+
+# random frontier positions EasyAgent tries before listing the ones next to its stones
+_FRONTIER_DRAWS = 8
 
 
 class EasyAgent(Agent):
@@ -38,11 +40,40 @@ class EasyAgent(Agent):
 
     def predict(self, obs=None):
         self._update_available_position()
-        chosen_pos = random.choice(self._available_positions) if self._randomness \
-            else self._available_positions[0]
+        if len(self._available_positions) == 0:
+            # no threat or free end to play, any position next to a stone
+            chosen_pos = self._frontier_position()
+        else:
+            chosen_pos = random.choice(self._available_positions) if self._randomness \
+                else self._available_positions[0]
         self._available_positions = []  # reset the available positions
         return chosen_pos, None
 
+    def _frontier_position(self):
+        """
+        :return: a position of the frontier next to a stone of the agent if there is one, to extend its patterns
+        """
+        frontier = self._board.frontier
+        if len(frontier) == 0:
+            # cannot find any available positions, get a random positions,
+            # should not happen (often)
+            pos, _ = RandomAgent(self.board, self.stone_color).predict()
+            return pos
+        if self._randomness:
+            # uniform over the positions next to own stones, usually found in a few draws
+            for _ in range(_FRONTIER_DRAWS):
+                cell = frontier.choice()
+                if self._next_to_own_stone(cell):
+                    return list(divmod(cell, self._board.board_size))
+        cells = [cell for cell in frontier if self._next_to_own_stone(cell)] or list(frontier)
+        cell = random.choice(cells) if self._randomness else cells[0]
+        return list(divmod(cell, self._board.board_size))
+
+    def _next_to_own_stone(self, cell):
+        row, col = divmod(cell, self._board.board_size)
+        around = self._board.board_state[max(row - 1, 0):row + 2, max(col - 1, 0):col + 2]
+        return bool((around == self.stone_color.value).any())
+
     def _update_available_position(self):
         if len(self.patterns) == 0:
             if len(self.opponent_patterns) == 0:
@@ -51,14 +82,18 @@ class EasyAgent(Agent):
                 self._available_positions = [
                     [self._board.board_size // 2, self._board.board_size // 2]
                 ]
-            else:
-                # Only opponent stone, place stone around the opponent
-                self._available_positions = self._check_stone_surroundings(
-                    self.opponent_patterns[0].stones[0],
-                    Orientation.any
-                )
+            # otherwise only opponent stones, predict() places the stone around them with the frontier
         else:
-            if self._need_defence():
+            # five positions also cover split fours, e.g. |X|X|_|X|X|
+            fives = self._board.board_shapes.positions(self.stone_color, Shape.five)
+            opponent_fives = self._board.board_shapes.positions(self.stone_color.next(), Shape.five)
+            if len(fives) > 0:
+                # WIN
+                self._available_positions = [list(position) for position in fives]
+            elif len(opponent_fives) > 0 and random.random() < self._defend_opponent_four_probability:
+                # DEFENCE against a four
+                self._available_positions = [list(position) for position in opponent_fives]
+            elif self._need_defence():
                 # DEFENCE
                 # as the pattern has more than 1 free end to need defence,
                 # the _available_positions should have at least one item
@@ -70,56 +105,18 @@ class EasyAgent(Agent):
                 # go through the patterns and find available_positions in free end
                 while len(self._available_positions) == 0 and pattern_index < pattern_index_limit:
                     current_pattern = self.patterns[pattern_index]
-                    if current_pattern.orientation == Orientation.any:
-                        # self._available_positions = self._check_stone_surroundings(
-                        #     current_pattern.stones[0],
-                        #     Orientation.any
-                        # )
-                        pass
-                    else:
-                        if current_pattern.free_end_number > 0:
-                            # has free end stone, use the free end
-                            self._update_available_position_based_on_free_end(current_pattern)
-                        else:
-                            # no free end stone, check next
-                            pass
-                    pattern_index += 1
-
-                pattern_index = 0
-                # go through the patterns and find available_positions in any position of
-                # the stones in pattern
-                while len(self._available_positions) == 0 and pattern_index < pattern_index_limit:
-                    current_pattern = self.patterns[pattern_index]
-
-                    # Can be optimized in advanced agent
-                    for stone in current_pattern.stones:
-                        self._available_positions += self._check_stone_surroundings(
-                            stone,
-                            Orientation.any
-                        )
-
+                    # a single stone has no end positions, patterns without a free end are skipped
+                    if current_pattern.orientation != Orientation.any and current_pattern.free_end_number > 0:
+                        self._update_available_position_based_on_free_end(current_pattern)
                     pattern_index += 1
 
-                # cannot find any available positions, get a random positions,
-                # should not happen (often)
-                if len(self._available_positions) == 0:
-                    temp_agent = RandomAgent(self.board, self.stone_color)
-                    pos, _ = temp_agent.predict()
-                    self._available_positions = [pos]
-
     def _need_defence(self):
-        # TODO: cannot defend |X|X|_|X| pattern
-        # if the agent longest pattern has 4 stones and free end, attack and win
-        if self.patterns[0].number_of_stones >= 4 and self.patterns[0].free_end_number > 0:
-            return False
-        # opponent longest pattern has more than 3 stones and has more than 1 free end
-        # or more than 4 stones and has more than 0 free end, need defence
+        # fours of both colors are handled with the five positions of the board shapes
+        # opponent longest pattern has more than 3 stones and has more than 1 free end, need defence
         opponent_longest_pattern = self.opponent_patterns[0]
         opponent_ns = opponent_longest_pattern.number_of_stones
         opponent_fe = opponent_longest_pattern.free_end_number
-        defend_four = opponent_ns >= 4 and opponent_fe > 0 and random.random() < self._defend_opponent_four_probability
-        defend_three = opponent_ns >= 3 and opponent_fe > 1
-        need_defence = defend_four or defend_three
+        need_defence = opponent_ns >= 3 and opponent_fe > 1
         return need_defence
 
     def _update_available_position_based_on_free_end(self, pattern):
@@ -128,34 +125,6 @@ class EasyAgent(Agent):
             if position is not None:
                 self._available_positions += [position]
 
-    def _check_stone_surroundings(self, stone, orientation):
-        row, col = stone.position
-        available_positions = []
-        if orientation == Orientation.horizontal or orientation == Orientation.any:
-            available_positions += self._check_stone_surroundings_in(row, col, [-1, 0], [1, 0])
-        if orientation == Orientation.vertical or orientation == Orientation.any:
-            available_positions += self._check_stone_surroundings_in(row, col, [0, 1], [0, -1])
-        if orientation == Orientation.left_diagonal or orientation == Orientation.any:
-            available_positions += self._check_stone_surroundings_in(row, col, [-1, 1], [1, -1])
-        if orientation == Orientation.right_diagonal or orientation == Orientation.any:
-            available_positions += self._check_stone_surroundings_in(row, col, [-1, -1], [1, 1])
-        return available_positions
-
-    def _check_stone_surroundings_in(self, row, col, o1, o2):
-        available_position = []
-        for dr, dc in [o1, o2]:
-            if self._check_empty_in_dr_dc(row, col, dr, dc):
-                available_position.append((row + dr, col + dc))
-        return available_position
-
-    def _check_empty_in_dr_dc(self, row, col, dr, dc):
-        row += dr
-        col += dc
-        if self._board.position_exist(row, col):
-            return self._board.board_state[row][col] == 0
-        else:
-            return False
-
     @property
     def available_position(self):
         return self._available_positions
@@ -173,3 +142,509 @@ class EasyAgent(Agent):
             return self._board.board_patterns.black_stone_patterns
         else:
             return self._board.board_patterns.white_stone_patterns
+
+
+def _near_empty_positions(board_state, distance):
+    """
+    :return: empty positions within distance of a stone, as (row, col) tuples
+    """
+    occupied = board_state != 0
+    size = board_state.shape[0]
+    padded = np.pad(occupied, distance)
+    near = np.zeros_like(occupied)
+    for dr in range(2 * distance + 1):
+        for dc in range(2 * distance + 1):
+            near |= padded[dr:dr + size, dc:dc + size]
+    return [(int(row), int(col)) for row, col in zip(*np.nonzero(near & ~occupied))]
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+# score of a won position, wins found at a lower depth score slightly higher
+WIN_SCORE = 10 ** 7
+# transposition table entry flags
+_EXACT, _LOWER_BOUND, _UPPER_BOUND = 0, 1, 2
+
+
+# score of a move on an empty position by the Shape it makes along one line
+_SHAPE_SCORES = np.zeros(len(Shape), dtype=np.int64)
+_SHAPE_SCORES[[Shape.two, Shape.closed_three, Shape.split_three, Shape.open_three,
+               Shape.four, Shape.open_four, Shape.five]] = [10, 50, 400, 500, 1000, 10 ** 4, 10 ** 5]
+
+
+class MinimaxAgent(Agent):
+    """
+    Alpha-beta (negamax) search with iterative deepening, stopped after max_depth or time_limit seconds.
+    Only empty positions within neighbour_distance of a stone are searched, ordered by the
+    transposition table move, killer moves and the history heuristic.
+    """
+    def __init__(self, board, stone_color, randomness=True,
+                 max_depth=4, time_limit=1.0, neighbour_distance=1, max_table_size=10 ** 6):
+        Agent.__init__(self, board, stone_color, randomness)
+        self._max_depth = max_depth
+        self._time_limit = time_limit
+        self._neighbour_distance = neighbour_distance
+        self._max_table_size = max_table_size
+        # hash_key -> (depth, score, flag, move)
+        self._transposition_table = {}
+        self._history_scores = {}
+        self._killer_moves = []
+        self._deadline = None
+        self._nodes = 0
+
+    def predict(self, obs=None):
+        candidates = self._candidate_moves()
+        if len(candidates) == 0:
+            # No stone, i.e. start of the game
+            # Place stone in middle
+            return [self._board.board_size // 2, self._board.board_size // 2], None
+        if len(self._transposition_table) > self._max_table_size:
+            self._transposition_table.clear()
+        if self._randomness:
+            random.shuffle(candidates)
+
+        self._deadline = time.perf_counter() + self._time_limit
+        self._nodes = 0
+        self._killer_moves = [[] for _ in range(self._max_depth + 1)]
+        best_move = candidates[0]
+        for depth in range(1, self._max_depth + 1):
+            try:
+                # search the best move of the previous iteration first
+                candidates.remove(best_move)
+                candidates.insert(0, best_move)
+                score, move = self._search_root(candidates, depth, keep_first=depth > 1)
+            except _SearchTimeout:
+                break
+            best_move = move
+            if abs(score) >= WIN_SCORE - self._max_depth:
+                # forced win or loss found, deeper search does not change it
+                break
+        return list(best_move), None
+
+    def _search_root(self, candidates, depth, keep_first):
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_score, best_move = -WIN_SCORE - 1, None
+        for move in self._ordered_moves(candidates, 0, keep_first):
+            score = self._score_move(move, depth, alpha, beta, 0)
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+        self._transposition_table[self._board.hash_key] = (depth, best_score, _EXACT, best_move)
+        return best_score, best_move
+
+    def _score_move(self, move, depth, alpha, beta, ply):
+        with self._board.push(move) as (have_five, is_full):
+            if have_five:
+                return WIN_SCORE - ply - 1
+            if is_full:
+                return 0
+            return -self._negamax(depth - 1, -beta, -alpha, ply + 1)
+
+    def _negamax(self, depth, alpha, beta, ply):
+        self._nodes += 1
+        if self._nodes % 256 == 0 and time.perf_counter() > self._deadline:
+            raise _SearchTimeout
+
+        hash_key = self._board.hash_key
+        original_alpha = alpha
+        table_move = None
+        entry = self._transposition_table.get(hash_key)
+        if entry is not None:
+            entry_depth, entry_score, flag, table_move = entry
+            entry_score = self._from_table_score(entry_score, ply)
+            if entry_depth >= depth:
+                if flag == _EXACT:
+                    return entry_score
+                elif flag == _LOWER_BOUND:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+
+        if depth == 0:
+            return self._evaluate()
+
+        moves = self._candidate_moves()
+        if table_move is not None and table_move in moves:
+            moves.remove(table_move)
+            moves.insert(0, table_move)
+        best_score, best_move = -WIN_SCORE - 1, None
+        for move in self._ordered_moves(moves, ply, keep_first=table_move is not None):
+            score = self._score_move(move, depth, alpha, beta, ply)
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                self._record_cutoff(move, depth, ply)
+                break
+
+        if best_score <= original_alpha:
+            flag = _UPPER_BOUND
+        elif best_score >= beta:
+            flag = _LOWER_BOUND
+        else:
+            flag = _EXACT
+        self._transposition_table[hash_key] = (depth, self._to_table_score(best_score, ply), flag, best_move)
+        return best_score
+
+    def _to_table_score(self, score, ply):
+        """
+        win and loss scores count the plies from the root, in the table they count them from the position, so
+        that the entry holds when the position is reached at another ply or from another root
+        """
+        if score >= WIN_SCORE - self._max_depth:
+            return score + ply
+        if score <= -WIN_SCORE + self._max_depth:
+            return score - ply
+        return score
+
+    def _from_table_score(self, score, ply):
+        """
+        revert _to_table_score() for the position at ply
+        """
+        if score >= WIN_SCORE - self._max_depth:
+            return score - ply
+        if score <= -WIN_SCORE + self._max_depth:
+            return score + ply
+        return score
+
+    def _evaluate(self):
+        """
+        :return: static score of the position for the color to move
+        """
+        board_shapes = self._board.board_shapes
+        empty = board_shapes.empty
+        black_score = _SHAPE_SCORES[board_shapes.shapes(StoneColor.black)[empty]].sum()
+        white_score = _SHAPE_SCORES[board_shapes.shapes(StoneColor.white)[empty]].sum()
+        score = int(black_score - white_score)
+        return score if self._board.current_stone_color == StoneColor.black else -score
+
+    def _candidate_moves(self):
+        """
+        :return: empty positions within neighbour_distance of a stone, as (row, col) tuples
+        """
+        if self._neighbour_distance == self._board.frontier_distance:
+            # kept up to date by the board on every step and undo of the search
+            return [divmod(cell, self._board.board_size) for cell in self._board.frontier]
+        return _near_empty_positions(self._board.board_state, self._neighbour_distance)
+
+    def _ordered_moves(self, moves, ply, keep_first=False):
+        """
+        moves making a four or an open three for either color and killer moves first, then by history score
+        """
+        threats = set(self._board.board_shapes.positions(None, Shape.split_three))
+        killers = self._killer_moves[ply] if ply < len(self._killer_moves) else []
+        first, rest = (moves[:1], moves[1:]) if keep_first else ([], moves)
+        return first + sorted(rest, key=lambda move: (move not in threats,
+                                                      move not in killers,
+                                                      -self._history_scores.get(move, 0)))
+
+    def _record_cutoff(self, move, depth, ply):
+        if ply < len(self._killer_moves) and move not in self._killer_moves[ply]:
+            self._killer_moves[ply] = [move] + self._killer_moves[ply][:1]
+        self._history_scores[move] = self._history_scores.get(move, 0) + depth * depth
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+
+def random_rollout(bit_board):
+    """
+    play random moves until the game ends
+    :return: color of the winner, None for a draw
+    """
+    size = bit_board.board_size
+    cells = np.flatnonzero(bit_board.board_state.reshape(-1) == 0)
+    np.random.shuffle(cells)
+    for cell in cells.tolist():
+        have_five, is_full = bit_board.step(divmod(cell, size))
+        if have_five:
+            return bit_board.current_stone_color
+        if is_full:
+            return None
+    return None
+
+
+class _TreeNode(object):
+    def __init__(self, prior=1.0):
+        self.prior = prior
+        # move -> _TreeNode, None until the node is expanded
+        self.children = None
+        self.visits = 0
+        # sum of the results for the color that played the move leading to this node
+        self.value_sum = 0.0
+        # 1 if the move leading to this node won the game, 0 for a draw, None if the game goes on
+        self.terminal_value = None
+
+    @property
+    def q(self):
+        return self.value_sum / self.visits if self.visits > 0 else 0.0
+
+
+class MCTSAgent(Agent):
+    """
+    Monte Carlo tree search, UCT with random rollouts by default.
+
+    Playouts run on a BitBoard copy of the position. rollout_policy(bit_board) returns the color of the
+    winner (None for a draw). evaluator(observations) is called with up to batch_size leaf observations,
+    shape (B, board_size ** 2) with +1 for the stones of the color to move, and returns (policies, values):
+    move probabilities of shape (B, board_size ** 2) and values in [-1, 1] for the color to move; with an
+    evaluator the children are selected with PUCT instead of UCT.
+    The subtree of the position reached after the chosen move and the opponent reply is kept for the
+    next predict().
+    """
+    def __init__(self, board, stone_color, randomness=True,
+                 playouts=400, time_limit=None, exploration=1.4, neighbour_distance=1,
+                 rollout_policy=random_rollout, evaluator=None, batch_size=8):
+        """
+        :param playouts: playouts per move, None for as many as fit in time_limit seconds
+        """
+        Agent.__init__(self, board, stone_color, randomness)
+        if playouts is None and time_limit is None:
+            raise ValueError("playouts or time_limit must be given")
+        self._playouts = playouts if playouts is not None else math.inf
+        self._time_limit = time_limit
+        self._exploration = exploration
+        self._neighbour_distance = neighbour_distance
+        self._rollout_policy = rollout_policy
+        self._evaluator = evaluator
+        self._batch_size = batch_size if evaluator is not None else 1
+        self._root = None
+        self._root_moves = []
+        self._root_board = None
+
+    def predict(self, obs=None):
+        if len(self._board.stone_array) == 0:
+            # No stone, i.e. start of the game
+            # Place stone in middle
+            return [self._board.board_size // 2, self._board.board_size // 2], None
+
+        self._update_root()
+        deadline = time.perf_counter() + self._time_limit if self._time_limit is not None else None
+        playouts = 0
+        while playouts < self._playouts and (deadline is None or time.perf_counter() < deadline):
+            playouts += self._run_batch(int(min(self._batch_size, self._playouts - playouts)))
+
+        most_visits = max(child.visits for child in self._root.children.values())
+        best_moves = [move for move, child in self._root.children.items() if child.visits == most_visits]
+        move = random.choice(best_moves) if self._randomness else best_moves[0]
+        # keep the subtree of the chosen move
+        self._root = self._root.children[move]
+        self._root_moves = self._root_moves + [move]
+        return list(move), None
+
+    def _update_root(self):
+        """
+        reuse the subtree of the current position if the moves since the last root are in the tree
+        """
+        moves = [tuple(stone.position) for stone in self._board.stone_array]
+        reused = self._root is not None and moves[:len(self._root_moves)] == self._root_moves
+        if reused:
+            for move in moves[len(self._root_moves):]:
+                if self._root.children is None or move not in self._root.children:
+                    reused = False
+                    break
+                self._root = self._root.children[move]
+        if not reused:
+            self._root = _TreeNode()
+        self._root_moves = moves
+        self._root_board = BitBoard.from_board_state(self._board.board_state, self._board.current_stone_color)
+        if self._root.children is None:
+            policy = None
+            if self._evaluator is not None:
+                policies, _ = self._evaluator(self._observations([self._root_board]))
+                policy = policies[0]
+            self._expand(self._root, self._root_board, policy)
+
+    def _run_batch(self, count):
+        leaves = []
+        for _ in range(count):
+            path, bit_board, value = self._select()
+            if value is not None:
+                self._backup(path, value)
+            else:
+                leaves.append((path, bit_board))
+        if len(leaves) > 0:
+            if self._evaluator is not None:
+                policies, values = self._evaluator(self._observations([bit_board for _, bit_board in leaves]))
+            else:
+                policies = [None] * len(leaves)
+                values = []
+                for _, bit_board in leaves:
+                    to_move = bit_board.current_stone_color
+                    winner = self._rollout_policy(bit_board.copy())
+                    values.append(0.0 if winner is None else (1.0 if winner == to_move else -1.0))
+            for (path, bit_board), policy, value in zip(leaves, policies, values):
+                if path[-1].children is None:
+                    self._expand(path[-1], bit_board, policy)
+                # value is for the color to move at the leaf, the leaf node stores it for the other color
+                self._backup(path, -float(value))
+        return count
+
+    @staticmethod
+    def _observations(bit_boards):
+        return np.stack([bit_board.board_state.reshape(-1) * bit_board.current_stone_color.value
+                         for bit_board in bit_boards]).astype(np.int8)
+
+    def _select(self):
+        """
+        walk down the tree from the root, adding a virtual loss to every node on the path
+        :return: (path, bit_board at the leaf, value of a terminal leaf or None)
+        """
+        node = self._root
+        bit_board = self._root_board.copy()
+        path = [node]
+        node.visits += 1
+        value = None
+        while node.children is not None and len(node.children) > 0:
+            move, node = self._select_child(node)
+            path.append(node)
+            node.visits += 1
+            node.value_sum -= 1
+            if node.terminal_value is None:
+                have_five, is_full = bit_board.step(move)
+                if have_five or is_full:
+                    node.terminal_value = 1.0 if have_five else 0.0
+            if node.terminal_value is not None:
+                value = node.terminal_value
+                break
+        return path, bit_board, value
+
+    def _select_child(self, node):
+        best_score, best = -math.inf, None
+        log_visits = math.log(node.visits)
+        sqrt_visits = math.sqrt(node.visits)
+        for move, child in node.children.items():
+            if self._evaluator is not None:
+                score = child.q + self._exploration * child.prior * sqrt_visits / (1 + child.visits)
+            elif child.visits == 0:
+                score = math.inf
+            else:
+                score = child.q + self._exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best_score, best = score, (move, child)
+        return best
+
+    def _expand(self, node, bit_board, policy):
+        # play a winning position if there is one, otherwise block the winning positions of the opponent
+        moves = bit_board.winning_positions(bit_board.current_stone_color)
+        if len(moves) == 0:
+            moves = bit_board.winning_positions(bit_board.current_stone_color.next())
+        if len(moves) == 0:
+            moves = _near_empty_positions(bit_board.board_state, self._neighbour_distance)
+        if len(moves) == 0:
+            moves = [(int(row), int(col)) for row, col in zip(*np.nonzero(bit_board.board_state == 0))]
+        if self._randomness:
+            random.shuffle(moves)
+        size = bit_board.board_size
+        if policy is not None:
+            priors = np.array([policy[row * size + col] for row, col in moves], dtype=float)
+            priors = priors / priors.sum() if priors.sum() > 0 else np.full(len(moves), 1.0 / len(moves))
+        else:
+            priors = np.full(len(moves), 1.0 / len(moves))
+        node.children = {move: _TreeNode(prior) for move, prior in zip(moves, priors.tolist())}
+
+    @staticmethod
+    def _backup(path, value):
+        """
+        :param value: result for the color that played the move leading to the last node of the path
+        """
+        for node in reversed(path):
+            # remove the virtual loss added in _select()
+            node.value_sum += value + 1
+            value = -value
+        # the root has no move leading to it and got no virtual loss
+        path[0].value_sum -= 1
+
+    @property
+    def root(self):
+        return self._root
+
+
+class PredictionCache(object):
+    """
+    Least recently used moves of positions, CachedAgent keys them by (agent_class, board_size, hash_key),
+    hash_key includes the color to move. A cache can be shared by agents, e.g. across the games of a self-play
+    worker, each agent_class only reads its own moves.
+    """
+    def __init__(self, max_entries=10 ** 5):
+        """
+        :param max_entries: bound on the number of moves, not on bytes, an entry takes about 250 bytes
+        """
+        self._max_entries = max_entries
+        self._moves = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        :return: the cached move of the key, None if there is none
+        """
+        move = self._moves.get(key)
+        if move is None:
+            self.misses += 1
+            return None
+        self._moves.move_to_end(key)
+        self.hits += 1
+        return move
+
+    def put(self, key, move):
+        self._moves[key] = move
+        self._moves.move_to_end(key)
+        if len(self._moves) > self._max_entries:
+            # evict the least recently used move
+            self._moves.popitem(last=False)
+
+    def clear(self):
+        self._moves.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._moves)
+
+    @property
+    def max_entries(self):
+        return self._max_entries
+
+
+class CachedAgent(Agent):
+    """
+    Plays the move agent_class predicted the last time the position was seen, e.g.
+        functools.partial(CachedAgent, agent_class=MinimaxAgent, cache=PredictionCache(10 ** 4))
+    An agent with randomness does not always play the same move, its moves are only cached with cache_random.
+    """
+    def __init__(self, board, stone_color, randomness=True, agent_class=None, cache=None, cache_random=False):
+        """
+        :param agent_class: MinimaxAgent if None, part of the cache key, agents share moves only if they are made
+                            with the same class or the same functools.partial
+        :param cache: PredictionCache, a new one if None
+        """
+        Agent.__init__(self, board, stone_color, randomness)
+        self._agent_class = agent_class or MinimaxAgent
+        self._agent = self._agent_class(board, stone_color, randomness)
+        self._cache = cache if cache is not None else PredictionCache()
+        self._bypass = randomness and not cache_random
+
+    def predict(self, obs=None):
+        if self._bypass:
+            return self._agent.predict(obs)
+        key = (self._agent_class, self._board.board_size, self._board.hash_key)
+        move = self._cache.get(key)
+        if move is None:
+            move, _ = self._agent.predict(obs)
+            move = tuple(move)
+            self._cache.put(key, move)
+        return list(move), None
+
+    @property
+    def agent(self):
+        return self._agent
+
+    @property
+    def cache(self):
+        return self._cache
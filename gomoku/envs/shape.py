@@ -0,0 +1,192 @@
+import enum
+import functools
+import itertools
+import numpy as np
+from gomoku.envs.boardUtils import StoneColor
+
+# line directions as [row, column] offsets, same order as the last axis of BoardShape.shapes()
+DIRECTIONS = [[0, 1], [1, 0], [1, 1], [1, -1]]
+# cells on each side of the center of a line window
+HALF_WINDOW = 4
+WINDOW_SIZE = 2 * HALF_WINDOW + 1
+# cell values of a window code, an opponent stone and a position outside the board are both BLOCKED
+EMPTY, OWN, BLOCKED = 0, 1, 2
+
+
+class Shape(enum.IntEnum):
+    """
+    shape of a line through a position with a stone of the color on it, stronger shapes are larger
+    """
+    none = 0
+    # one more stone makes an open or split three
+    two = 1
+    # one more stone makes a four
+    closed_three = 2
+    # |_|X|_|X|X|_|, one more stone makes an open four
+    split_three = 3
+    # |_|X|X|X|_|, one more stone makes an open four
+    open_three = 4
+    # one position makes five, e.g. |X|X|_|X|X|
+    four = 5
+    # two or more positions make five
+    open_four = 6
+    five = 7
+
+
+def _five_positions(cells):
+    positions = set()
+    for start in range(WINDOW_SIZE - 4):
+        segment = cells[start:start + 5]
+        if BLOCKED not in segment and segment.count(OWN) == 4:
+            positions.add(start + segment.index(EMPTY))
+    return positions
+
+
+def _classify(cells, memo):
+    """
+    :param cells: tuple of WINDOW_SIZE cell values, the center is taken as a stone of the color
+    """
+    if cells[HALF_WINDOW] == BLOCKED:
+        return Shape.none
+    cells = cells[:HALF_WINDOW] + (OWN,) + cells[HALF_WINDOW + 1:]
+    if cells in memo:
+        return memo[cells]
+
+    if any(cells[start:start + 5] == (OWN,) * 5 for start in range(WINDOW_SIZE - 4)):
+        shape = Shape.five
+    else:
+        number_of_fives = len(_five_positions(cells))
+        if number_of_fives >= 2:
+            shape = Shape.open_four
+        elif number_of_fives == 1:
+            shape = Shape.four
+        else:
+            shape = Shape.none
+            for position, cell in enumerate(cells):
+                if cell != EMPTY:
+                    continue
+                next_cells = cells[:position] + (OWN,) + cells[position + 1:]
+                next_shape = _classify(next_cells, memo)
+                if next_shape == Shape.open_four:
+                    # the stone fills a gap between two stones
+                    split = 0 < position < WINDOW_SIZE - 1 and \
+                        next_cells[position - 1] == OWN and next_cells[position + 1] == OWN
+                    shape = max(shape, Shape.split_three if split else Shape.open_three)
+                elif next_shape == Shape.four:
+                    shape = max(shape, Shape.closed_three)
+                elif next_shape in (Shape.open_three, Shape.split_three):
+                    shape = max(shape, Shape.two)
+    memo[cells] = shape
+    return shape
+
+
+@functools.lru_cache()
+def shape_table():
+    """
+    :return: read-only (3 ** WINDOW_SIZE,) int8 array of Shape values, indexed by the window code
+             sum(cell_value[i] * 3 ** i), cell i is at offset i - HALF_WINDOW from the center along the line
+    """
+    memo = {}
+    table = np.zeros(3 ** WINDOW_SIZE, dtype=np.int8)
+    # product() counts with the last item as the lowest digit
+    for code, digits in enumerate(itertools.product((EMPTY, OWN, BLOCKED), repeat=WINDOW_SIZE)):
+        table[code] = _classify(digits[::-1], memo)
+    table.setflags(write=False)
+    return table
+
+
+@functools.lru_cache()
+def _line_tables(board_size):
+    """
+    :return: (initial_codes, updates)
+             initial_codes: (board_size ** 2 * 4,) window codes of the empty board, outside positions are BLOCKED
+             updates[cell]: (indices, weights), the entries of the windows through cell and the weight
+                            3 ** i of the cell in each of them
+    """
+    n = board_size
+    initial_codes = np.zeros(n * n * len(DIRECTIONS), dtype=np.int64)
+    indices = [[] for _ in range(n * n)]
+    weights = [[] for _ in range(n * n)]
+    for row in range(n):
+        for col in range(n):
+            for direction, (dr, dc) in enumerate(DIRECTIONS):
+                entry = (row * n + col) * len(DIRECTIONS) + direction
+                for i in range(WINDOW_SIZE):
+                    r = row + (i - HALF_WINDOW) * dr
+                    c = col + (i - HALF_WINDOW) * dc
+                    if 0 <= r < n and 0 <= c < n:
+                        indices[r * n + c].append(entry)
+                        weights[r * n + c].append(3 ** i)
+                    else:
+                        initial_codes[entry] += BLOCKED * 3 ** i
+    updates = [(np.array(i, dtype=np.int64), np.array(w, dtype=np.int64)) for i, w in zip(indices, weights)]
+    initial_codes.setflags(write=False)
+    return initial_codes, updates
+
+
+class BoardShape(object):
+    """
+    Shape of the four lines through every position, for both colors.
+
+    Each position keeps the base-3 code of the 9-cell window along every direction, a stone only changes
+    the windows of the 32 positions on the lines through it, so the codes and the Shape lookups are updated
+    there and undone exactly by remove_stone().
+    """
+    def __init__(self, board_size=15):
+        self._board_size = board_size
+        initial_codes, self._updates = _line_tables(board_size)
+        self._table = shape_table()
+        self._codes = [initial_codes.copy(), initial_codes.copy()]
+        self._shapes = [self._table[initial_codes], self._table[initial_codes]]
+        self._empty = np.ones(board_size ** 2, dtype=bool)
+
+    def add_stone(self, cell, color):
+        """
+        :param cell: row * board_size + col
+        """
+        self._update(cell, color, 1)
+        self._empty[cell] = False
+
+    def remove_stone(self, cell, color):
+        self._update(cell, color, -1)
+        self._empty[cell] = True
+
+    def _update(self, cell, color, sign):
+        indices, weights = self._updates[cell]
+        own = 0 if color == StoneColor.black else 1
+        for index, value in [(own, OWN), (1 - own, BLOCKED)]:
+            codes = self._codes[index]
+            codes[indices] += sign * value * weights
+            self._shapes[index][indices] = self._table[codes[indices]]
+
+    def shapes(self, color):
+        """
+        :return: (board_size ** 2, 4) int8 array, Shape of every line through every position with a stone of
+                 the color on it, i.e. the shape a move makes on an empty position and the current shape on a
+                 stone of the color; Shape.none on the stones of the opponent
+        """
+        return self._shapes[0 if color == StoneColor.black else 1].reshape(self._board_size ** 2, len(DIRECTIONS))
+
+    def best_shapes(self, color=None):
+        """
+        :param color: None for the stronger of both colors
+        :return: (board_size ** 2,) strongest Shape a move of the color makes, Shape.none on the stones
+        """
+        if color is None:
+            shapes = np.maximum(self._shapes[0], self._shapes[1]).reshape(self._board_size ** 2, len(DIRECTIONS))
+        else:
+            shapes = self.shapes(color)
+        # plain ints, numpy is slow with enum members
+        return np.where(self._empty, shapes.max(axis=1), int(Shape.none))
+
+    def positions(self, color, shape):
+        """
+        :param color: None for the moves of either color
+        :return: empty positions where a move of the color makes at least the shape, as (row, col) tuples
+        """
+        cells = np.flatnonzero(self.best_shapes(color) >= int(shape)).tolist()
+        return [divmod(cell, self._board_size) for cell in cells]
+
+    @property
+    def empty(self):
+        return self._empty
@@ -0,0 +1,268 @@
+import time
+from gomoku.envs.boardUtils import StoneColor, zobrist_keys
+from gomoku.envs.opponent import Agent, EasyAgent
+
+# color index of the solver, black stones are 1 and white stones are 2 in the cell list
+_COLORS = (StoneColor.black, StoneColor.white)
+_DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class ThreatSolver(object):
+    """
+    Threat-space search for forced wins: victory by continuous fours (VCF), where every attacking move
+    makes a four, and victory by continuous threes (VCT), where open threes are played as well.
+
+    The position is kept as the stone counts of every line of five cells, so the threats of a color are
+    read from the lines with no opponent stone. A four is only answered at its five position, an open three
+    at the empty cells of the attacker's three-stone lines or with a four of the defender.
+    Depth-first search with iterative deepening over the number of attacking moves, stopped after
+    max_nodes positions or time_limit seconds; results are cached by zobrist hash.
+    """
+    def __init__(self, board_size=15, max_depth=12, max_nodes=20000, time_limit=None, max_table_size=10 ** 6):
+        self._board_size = board_size
+        self._max_depth = max_depth
+        self._max_nodes = max_nodes
+        self._time_limit = time_limit
+        self._max_table_size = max_table_size
+        color_keys, _ = zobrist_keys(board_size)
+        self._keys = [color_keys[color] for color in _COLORS]
+
+        # every line of five cells, and the lines through each cell
+        n = board_size
+        self._windows = []
+        for dr, dc in _DIRECTIONS:
+            for row in range(n):
+                for col in range(n):
+                    if 0 <= row + 4 * dr < n and 0 <= col + 4 * dc < n:
+                        self._windows.append(tuple((row + k * dr) * n + col + k * dc for k in range(5)))
+        self._cell_windows = [[] for _ in range(n * n)]
+        for window, cells in enumerate(self._windows):
+            for cell in cells:
+                self._cell_windows[cell].append(window)
+
+        # (hash, color index, vct) -> (depth, line or None)
+        self._table = {}
+        self._nodes = 0
+        self._deadline = None
+        self.set_position(None)
+
+    def set_position(self, board_state):
+        """
+        :param board_state: (board_size, board_size) array, 1 for black and -1 for white stones, None for empty
+        """
+        number_of_windows = len(self._windows)
+        self._cells = [0] * self._board_size ** 2
+        self._counts = [[0] * number_of_windows, [0] * number_of_windows]
+        # lines with at least two stones of the color and none of the opponent
+        self._live = [set(), set()]
+        self._hash = 0
+        if board_state is not None:
+            for cell, value in enumerate(board_state.reshape(-1).tolist()):
+                if value != 0:
+                    self._place(cell, 0 if value == StoneColor.black.value else 1)
+
+    def five_positions(self, color):
+        """
+        :return: empty positions where a stone of the color makes five in a row, as (row, col) tuples
+        """
+        return [self._position(cell) for cell in sorted(self._threat_cells(_COLORS.index(color), 4))]
+
+    def solve(self, color, vct=False, deadline=None):
+        """
+        search a forced win of the color in the position given to set_position(), the color is to move,
+        the position is unchanged afterwards, also when the budget is exceeded
+        :param deadline: time.perf_counter() time to stop at, instead of time_limit seconds from now
+        :return: winning line [attacking move, reply, attacking move, ...] as (row, col) tuples,
+                 the last move makes five; None if no forced win is found within the budget
+        """
+        if len(self._table) > self._max_table_size:
+            self._table.clear()
+        self._nodes = 0
+        if deadline is None and self._time_limit is not None:
+            deadline = time.perf_counter() + self._time_limit
+        self._deadline = deadline
+        index = _COLORS.index(color)
+        try:
+            for depth in range(1, self._max_depth + 1):
+                line = self._attack(index, depth, vct)
+                if line is not None:
+                    return line
+        except _BudgetExceeded:
+            pass
+        return None
+
+    def _attack(self, attacker, depth, vct):
+        """
+        :return: winning line of the attacker to move, None if there is none within depth attacking moves
+        """
+        self._nodes += 1
+        if self._nodes > self._max_nodes or \
+                (self._deadline is not None and self._nodes % 128 == 0 and time.perf_counter() > self._deadline):
+            raise _BudgetExceeded
+
+        wins = self._threat_cells(attacker, 4)
+        if len(wins) > 0:
+            return [self._position(min(wins))]
+        blocks = self._threat_cells(1 - attacker, 4)
+        if len(blocks) > 1 or depth == 0:
+            return None
+
+        key = (self._hash, attacker, vct)
+        entry = self._table.get(key)
+        if entry is not None and (entry[1] is not None or entry[0] >= depth):
+            return entry[1]
+
+        fours = self._threat_cells(attacker, 3)
+        threes = self._threat_cells(attacker, 2) - fours if vct else set()
+        if len(blocks) > 0:
+            # the opponent threatens five, only a block can go on
+            fours &= blocks
+            threes &= blocks
+        line = None
+        for cell in sorted(fours) + sorted(threes):
+            self._place(cell, attacker)
+            try:
+                reply_line = None
+                if cell in fours or self._is_open_three(cell, attacker):
+                    reply_line = self._defend(attacker, depth - 1, vct)
+            finally:
+                # also when the budget is exceeded deeper in the search
+                self._remove(cell, attacker)
+            if reply_line is not None:
+                line = [self._position(cell)] + reply_line
+                break
+        self._table[key] = (depth, line)
+        return line
+
+    def _defend(self, attacker, depth, vct):
+        """
+        :return: winning line of the attacker after the best defence, None if a defence holds
+        """
+        defender = 1 - attacker
+        if len(self._threat_cells(defender, 4)) > 0:
+            return None
+        replies = self._threat_cells(attacker, 4)
+        if len(replies) == 0:
+            if not vct:
+                return None
+            # block the three or counter with a four
+            replies = self._threat_cells(defender, 3)
+            for window in self._live[attacker]:
+                if self._counts[attacker][window] == 3:
+                    replies.update(self._empty_cells(window))
+        line = None
+        for cell in sorted(replies):
+            self._place(cell, defender)
+            try:
+                attack_line = self._attack(attacker, depth, vct)
+            finally:
+                self._remove(cell, defender)
+            if attack_line is None:
+                return None
+            if line is None:
+                line = [self._position(cell)] + attack_line
+        return line
+
+    def _is_open_three(self, cell, color):
+        """
+        :return: True if the stone at cell lets the color make two five positions with one more stone
+        """
+        for window in self._cell_windows[cell]:
+            if window in self._live[color] and self._counts[color][window] == 3:
+                for empty in self._empty_cells(window):
+                    self._place(empty, color)
+                    number_of_fives = len(self._threat_cells(color, 4))
+                    self._remove(empty, color)
+                    if number_of_fives >= 2:
+                        return True
+        return False
+
+    def _threat_cells(self, color, number_of_stones):
+        """
+        :return: set of the empty cells of the lines with number_of_stones stones of the color and none of
+                 the opponent, 4 gives the five positions, 3 the moves making a four
+        """
+        counts = self._counts[color]
+        cells = set()
+        for window in self._live[color]:
+            if counts[window] == number_of_stones:
+                cells.update(self._empty_cells(window))
+        return cells
+
+    def _empty_cells(self, window):
+        return [cell for cell in self._windows[window] if self._cells[cell] == 0]
+
+    def _place(self, cell, color):
+        self._cells[cell] = color + 1
+        self._hash ^= self._keys[color][cell]
+        own, other = self._counts[color], self._counts[1 - color]
+        live, other_live = self._live[color], self._live[1 - color]
+        for window in self._cell_windows[cell]:
+            own[window] += 1
+            other_live.discard(window)
+            if own[window] >= 2 and other[window] == 0:
+                live.add(window)
+
+    def _remove(self, cell, color):
+        self._cells[cell] = 0
+        self._hash ^= self._keys[color][cell]
+        own, other = self._counts[color], self._counts[1 - color]
+        live, other_live = self._live[color], self._live[1 - color]
+        for window in self._cell_windows[cell]:
+            own[window] -= 1
+            if own[window] < 2:
+                live.discard(window)
+            if own[window] == 0 and other[window] >= 2:
+                other_live.add(window)
+
+    def _position(self, cell):
+        return divmod(cell, self._board_size)
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+
+class ThreatSearchAgent(Agent):
+    """
+    Plays a forced win found by ThreatSolver, blocks a five of the opponent and takes the first move of the
+    opponent's forced win, otherwise plays as EasyAgent.
+    The searches of one predict() share time_limit seconds, max_nodes applies to each of them.
+    """
+    def __init__(self, board, stone_color, randomness=True,
+                 vct=True, max_depth=12, max_nodes=20000, time_limit=0.5):
+        Agent.__init__(self, board, stone_color, randomness)
+        self._vct = vct
+        self._time_limit = time_limit
+        self._solver = ThreatSolver(board.board_size, max_depth, max_nodes)
+        self._fallback = EasyAgent(board, stone_color, randomness)
+        self._line = None
+
+    def predict(self, obs=None):
+        self._solver.set_position(self._board.board_state)
+        opponent = self.stone_color.next()
+        deadline = time.perf_counter() + self._time_limit if self._time_limit is not None else None
+        self._line = self._solver.solve(self.stone_color, deadline=deadline)
+        if self._line is None:
+            blocks = self._solver.five_positions(opponent)
+            if len(blocks) > 0:
+                return list(blocks[0]), None
+            if self._vct:
+                self._line = self._solver.solve(self.stone_color, vct=True, deadline=deadline)
+        if self._line is not None:
+            return list(self._line[0]), None
+        opponent_line = self._solver.solve(opponent, vct=self._vct, deadline=deadline)
+        if opponent_line is not None:
+            return list(opponent_line[0]), None
+        return self._fallback.predict()
+
+    @property
+    def line(self):
+        """
+        forced win found by the last predict(), None if there was none
+        """
+        return self._line
@@ -0,0 +1,89 @@
+import numpy as np
+
+BACKGROUND_COLOR = (220, 179, 92)
+GRID_COLOR = (60, 40, 20)
+STONE_COLORS = {1: (20, 20, 20), -1: (240, 240, 240)}
+OUTLINE_COLOR = (0, 0, 0)
+LAST_MOVE_COLOR = (220, 30, 30)
+
+
+def _disc_coverage(cell_size, radius, supersampling=4):
+    """
+    :return: (cell_size, cell_size) fraction of every pixel inside a disc at the center of the cell
+    """
+    offsets = (np.arange(cell_size * supersampling) + 0.5) / supersampling - cell_size / 2
+    inside = offsets[:, np.newaxis] ** 2 + offsets[np.newaxis, :] ** 2 <= radius ** 2
+    return inside.reshape(cell_size, supersampling, cell_size, supersampling).mean(axis=(1, 3))
+
+
+class BoardRasterizer(object):
+    """
+    Draws a board as an (H, W, 3) uint8 frame with numpy, position (row, col) is the cell at pixel rows
+    row * cell_size and columns col * cell_size.
+
+    The grid background and the stone sprites are drawn once, the frame is kept between calls and only the
+    cells that changed since the last render, and the last move marker, are blitted again.
+    """
+    def __init__(self, board_size=15, cell_size=32):
+        self._board_size = board_size
+        self._cell_size = cell_size
+        size = board_size * cell_size
+
+        background = np.empty((size, size, 3), dtype=np.float32)
+        background[:] = BACKGROUND_COLOR
+        # grid lines through the cell centers, from the first to the last center
+        center = cell_size // 2
+        first, last = center, size - cell_size + center
+        for index in range(board_size):
+            line = index * cell_size + center
+            background[line, first:last + 1] = GRID_COLOR
+            background[first:last + 1, line] = GRID_COLOR
+        self._background = background
+
+        # premultiplied color and alpha of the sprites
+        outer = _disc_coverage(cell_size, 0.45 * cell_size)
+        inner = _disc_coverage(cell_size, 0.45 * cell_size - 1.5)
+        self._stone_sprites = {}
+        for value, color in STONE_COLORS.items():
+            premultiplied = inner[..., np.newaxis] * color + (outer - inner)[..., np.newaxis] * OUTLINE_COLOR
+            self._stone_sprites[value] = (premultiplied.astype(np.float32), outer[..., np.newaxis])
+        marker = _disc_coverage(cell_size, 0.12 * cell_size)[..., np.newaxis]
+        self._marker_sprite = ((marker * LAST_MOVE_COLOR).astype(np.float32), marker)
+
+        self._frame = np.rint(background).astype(np.uint8)
+        self._drawn_state = np.zeros((board_size, board_size), dtype=np.int8)
+        self._drawn_last_move = None
+
+    def render(self, board_state, last_move=None):
+        """
+        :param board_state: (board_size, board_size) array, 1 for black and -1 for white stones
+        :param last_move: (row, col) marked on the frame, None for no marker
+        :return: (H, W, 3) uint8 frame, a copy
+        """
+        last_move = tuple(last_move) if last_move is not None else None
+        changed = {(int(row), int(col)) for row, col in zip(*np.nonzero(board_state != self._drawn_state))}
+        # move the marker
+        changed.update(move for move in [self._drawn_last_move, last_move] if move is not None)
+        for row, col in changed:
+            self._draw_cell(row, col, int(board_state[row][col]), (row, col) == last_move)
+        self._drawn_state[:] = board_state
+        self._drawn_last_move = last_move
+        return self._frame.copy()
+
+    def _draw_cell(self, row, col, value, marked):
+        rows = slice(row * self._cell_size, (row + 1) * self._cell_size)
+        cols = slice(col * self._cell_size, (col + 1) * self._cell_size)
+        cell = self._background[rows, cols]
+        sprites = []
+        if value != 0:
+            sprites.append(self._stone_sprites[value])
+        if marked:
+            sprites.append(self._marker_sprite)
+        for premultiplied, alpha in sprites:
+            cell = cell * (1 - alpha) + premultiplied
+        self._frame[rows, cols] = np.rint(cell).astype(np.uint8)
+
+    @property
+    def shape(self):
+        size = self._board_size * self._cell_size
+        return size, size, 3
@@ -0,0 +1,161 @@
+import collections
+import os
+import numpy as np
+
+# moves: uint16 array of row * board_size + col in playing order
+# result: 1 black won, -1 white won, 0 draw
+GameRecord = collections.namedtuple('GameRecord', ['board_size', 'moves', 'result', 'seed', 'black', 'white'])
+# longest agent name of the header, in utf-8 bytes
+NAME_BYTES = 24
+
+# every game is stored as a header followed by its moves, row * board_size + col,
+# as uint8 if they fit (board_size <= 16) else as little-endian uint16
+HEADER_DTYPE = np.dtype([
+    ('board_size', 'u1'),
+    ('result', 'i1'),
+    ('move_bytes', 'u1'),
+    ('number_of_moves', '<u2'),
+    ('seed', '<i8'),
+    ('black', 'S{}'.format(NAME_BYTES)),
+    ('white', 'S{}'.format(NAME_BYTES)),
+])
+# byte offset of every game, kept next to the data file so that the reader does not scan it
+INDEX_SUFFIX = '.idx'
+
+
+def _move_dtype(board_size):
+    return np.dtype('u1') if board_size ** 2 <= 256 else np.dtype('<u2')
+
+
+class GameRecordWriter(object):
+    """
+    append games to a single file, e.g.
+        with GameRecordWriter(path) as writer:
+            for game in generate_games(1000):
+                writer.write(game)
+    """
+    def __init__(self, path):
+        self._data_file = open(path, 'ab')
+        self._index_file = open(path + INDEX_SUFFIX, 'ab')
+
+    def write(self, game):
+        """
+        :param game: GameRecord, the agent names are at most NAME_BYTES long
+        """
+        black, white = game.black.encode(), game.white.encode()
+        for name in [black, white]:
+            if len(name) > NAME_BYTES:
+                raise ValueError("agent name {!r} longer than {} bytes".format(name.decode(), NAME_BYTES))
+        move_dtype = _move_dtype(game.board_size)
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['board_size'] = game.board_size
+        header['result'] = game.result
+        header['move_bytes'] = move_dtype.itemsize
+        header['number_of_moves'] = len(game.moves)
+        header['seed'] = -1 if game.seed is None else game.seed
+        header['black'] = black
+        header['white'] = white
+        offset = self._data_file.seek(0, os.SEEK_END)
+        self._data_file.write(header.tobytes())
+        self._data_file.write(np.asarray(game.moves).astype(move_dtype).tobytes())
+        self._index_file.write(np.array([offset], dtype='<u8').tobytes())
+
+    def close(self):
+        self._data_file.close()
+        self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class GameRecordReader(object):
+    """
+    memory-maps a file written by GameRecordWriter, games are only read when accessed
+    """
+    def __init__(self, path):
+        size = os.path.getsize(path)
+        self._data = np.memmap(path, dtype=np.uint8, mode='r') if size > 0 else np.zeros(0, dtype=np.uint8)
+        index_path = path + INDEX_SUFFIX
+        self._offsets = None
+        if os.path.exists(index_path) and os.path.getsize(index_path) > 0:
+            offsets = np.memmap(index_path, dtype='<u8', mode='r')
+            # drop the games that were only partly written
+            number_of_games = len(offsets)
+            while number_of_games > 0 and self._game_end(int(offsets[number_of_games - 1])) < 0:
+                number_of_games -= 1
+            # the index is only trusted if it ends with the last complete game of the file
+            if number_of_games > 0:
+                end = self._game_end(int(offsets[number_of_games - 1]))
+                if end == size or self._game_end(end) < 0:
+                    self._offsets = offsets[:number_of_games]
+        if self._offsets is None:
+            self._offsets = self._scan()
+
+    def _header(self, offset):
+        return self._data[offset:offset + HEADER_DTYPE.itemsize].view(HEADER_DTYPE)[0]
+
+    def _game_end(self, offset):
+        """
+        :return: offset after the game, -1 if its header or moves run past the end of the file
+        """
+        if offset + HEADER_DTYPE.itemsize > len(self._data):
+            return -1
+        header = self._header(offset)
+        end = offset + HEADER_DTYPE.itemsize + int(header['number_of_moves']) * int(header['move_bytes'])
+        return end if end <= len(self._data) else -1
+
+    def _scan(self):
+        offsets = []
+        offset = 0
+        # stop at the first game that was only partly written, e.g. by an interrupted writer
+        while 0 <= offset < len(self._data) and self._game_end(offset) >= 0:
+            offsets.append(offset)
+            offset = self._game_end(offset)
+        return np.array(offsets, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        """
+        :return: GameRecord, moves is a read-only view of the file
+        """
+        offset = int(self._offsets[index])
+        header = self._header(offset)
+        start = offset + HEADER_DTYPE.itemsize
+        end = self._game_end(offset)
+        move_dtype = np.dtype('u1') if header['move_bytes'] == 1 else np.dtype('<u2')
+        seed = int(header['seed'])
+        return GameRecord(int(header['board_size']), self._data[start:end].view(move_dtype), int(header['result']),
+                          None if seed < 0 else seed, header['black'].decode(), header['white'].decode())
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def sample_positions(self, number_of_positions, rng=None):
+        """
+        sample positions uniformly from random games, the games must have the same board size
+        :return: (observations, actions, results)
+                 observations: (number_of_positions, board_size ** 2) int8, 1 for black and -1 for white stones
+                 actions: the move played in the position
+                 results: result of the game for the color to move, 1 win, -1 loss, 0 draw
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        games = rng.integers(0, len(self), number_of_positions)
+        observations, actions, results = None, np.zeros(number_of_positions, dtype=np.int64), \
+            np.zeros(number_of_positions, dtype=np.int8)
+        for i, game_index in enumerate(games):
+            game = self[game_index]
+            if observations is None:
+                observations = np.zeros((number_of_positions, game.board_size ** 2), dtype=np.int8)
+            ply = rng.integers(0, len(game.moves))
+            observations[i, game.moves[:ply:2]] = 1
+            observations[i, game.moves[1:ply:2]] = -1
+            actions[i] = game.moves[ply]
+            # black moves at even plies
+            results[i] = game.result if ply % 2 == 0 else -game.result
+        return observations, actions, results
@@ -0,0 +1,36 @@
+import matplotlib.patches as mpatches
+import matplotlib.pyplot as plt
+from gomoku.envs.boardUtils import StoneColor
+
+# this module imports matplotlib, gomoku.envs only imports it when a board is rendered
+
+
+def stone_patch(stone):
+    x, y = stone.position
+    facecolor = (0, 0, 0) if stone.color == StoneColor.black else (1, 1, 1)
+    radius = 0.45
+    zorder = 10
+    return mpatches.Circle((x, y), radius, facecolor=facecolor, edgecolor=(0, 0, 0), linewidth=1, clip_on=False,
+                           zorder=zorder)
+
+
+def draw_step_number(stone):
+    x, y = stone.position
+    color = (1, 1, 1) if stone.color == StoneColor.black else (0, 0, 0)
+    plt.text(x, y, str(stone.step), size=15, color=color, ha="center", va="center", zorder=20)
+
+
+def render_human(board):
+    """
+    draw the board and the step number of every stone in a new matplotlib figure
+    """
+    board_size = board.board_size
+    fig = plt.figure(figsize=[8, 8])
+    ax = fig.add_subplot(111, xticks=range(board_size), yticks=range(board_size), position=[.1, .1, .8, .8])
+    ax.grid(color='k', linestyle='-', linewidth=1)
+    ax.xaxis.set_tick_params(bottom='off', top='off', labelbottom='off')
+    ax.yaxis.set_tick_params(left='off', right='off', labelleft='off')
+    for stone in board.stone_array:
+        ax.add_patch(stone_patch(stone))
+        draw_step_number(stone)
+    plt.show()
@@ -0,0 +1,120 @@
+import argparse
+import collections
+import concurrent.futures
+import os
+import random
+import signal
+import time
+import numpy as np
+from gomoku.envs import opponent
+from gomoku.envs.board import Board
+from gomoku.envs.boardUtils import StoneColor
+from gomoku.record import GameRecord, GameRecordWriter
+
+
+def agent_name(agent_class):
+    # functools.partial keeps the class in func
+    return getattr(agent_class, '__name__', None) or agent_class.func.__name__
+
+
+def play_game(black_agent_class, white_agent_class, board_size=15, seed=None):
+    """
+    play one complete game, both agents share the board
+    :param seed: seeds python's and numpy's random number generators before the game
+    :return: GameRecord
+    """
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed % 2 ** 32)
+    board = Board(board_size)
+    agents = {
+        StoneColor.black: black_agent_class(board, StoneColor.black),
+        StoneColor.white: white_agent_class(board, StoneColor.white),
+    }
+    moves = []
+    while True:
+        color = board.current_stone_color
+        (row, col), _ = agents[color].predict()
+        have_five, is_full = board.step([row, col])
+        moves.append(row * board_size + col)
+        if have_five or is_full:
+            result = color.value if have_five else 0
+            break
+    return GameRecord(board_size, np.array(moves, dtype=np.uint16), result, seed,
+                      agent_name(black_agent_class), agent_name(white_agent_class))
+
+
+def _ignore_interrupt():
+    # the main process handles ctrl-c and shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _play_games(black_agent_class, white_agent_class, board_size, seeds):
+    return [play_game(black_agent_class, white_agent_class, board_size, seed) for seed in seeds]
+
+
+def generate_games(number_of_games, black_agent_class=opponent.EasyAgent, white_agent_class=opponent.EasyAgent,
+                   board_size=15, workers=None, chunk_size=16, seed=0):
+    """
+    play games in a process pool and yield each GameRecord as its chunk finishes
+    game i is played with seed + i, so the games do not depend on the number of workers
+    :param workers: number of processes, None for one per cpu
+    :param chunk_size: games played by a worker per task
+    """
+    workers = workers or os.cpu_count()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_ignore_interrupt) as executor:
+        # keep a few chunks per worker queued, instead of submitting every game up front
+        max_pending = 2 * workers
+        next_game = 0
+        pending = set()
+        try:
+            while next_game < number_of_games or len(pending) > 0:
+                while next_game < number_of_games and len(pending) < max_pending:
+                    seeds = list(range(seed + next_game, seed + min(next_game + chunk_size, number_of_games)))
+                    pending.add(executor.submit(_play_games, black_agent_class, white_agent_class,
+                                                board_size, seeds))
+                    next_game += len(seeds)
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    for game in future.result():
+                        yield game
+        finally:
+            # interrupted or closed early, drop the queued chunks
+            for future in pending:
+                future.cancel()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Generate self-play games in a process pool.')
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--black', default='EasyAgent', help='agent class in gomoku.envs.opponent')
+    parser.add_argument('--white', default='EasyAgent', help='agent class in gomoku.envs.opponent')
+    parser.add_argument('--board-size', type=int, default=15)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None, help='append the games to this game record file')
+    args = parser.parse_args(args)
+
+    writer = GameRecordWriter(args.output) if args.output is not None else None
+    results = collections.Counter()
+    start = time.perf_counter()
+    try:
+        for game in generate_games(args.games, getattr(opponent, args.black), getattr(opponent, args.white),
+                                   args.board_size, args.workers, args.chunk_size, args.seed):
+            results[game.result] += 1
+            if writer is not None:
+                writer.write(game)
+    except KeyboardInterrupt:
+        print('interrupted')
+    finally:
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - start
+    played = sum(results.values())
+    print('games: {} black: {} white: {} draw: {} games/s: {:.1f}'.format(
+        played, results[1], results[-1], results[0], played / elapsed))
+
+
+if __name__ == "__main__":
+    main()
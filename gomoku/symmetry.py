@@ -0,0 +1,82 @@
+import functools
+import numpy as np
+
+NUMBER_OF_SYMMETRIES = 8
+
+
+@functools.lru_cache()
+def symmetry_permutations(board_size):
+    """
+    index tables of the 8 rotations / reflections of the board, the first one is the identity
+    :return: (permutations, inverse_permutations), both (8, board_size ** 2) int arrays
+             permutations[k]: the transformed flat board is board[permutations[k]]
+             inverse_permutations[k]: action a is moved to inverse_permutations[k][a]
+    """
+    cells = np.arange(board_size ** 2).reshape(board_size, board_size)
+    transformed = [np.rot90(cells, k) for k in range(4)] + [np.rot90(np.fliplr(cells), k) for k in range(4)]
+    permutations = np.stack([t.reshape(-1) for t in transformed])
+    inverse_permutations = np.argsort(permutations, axis=1)
+    permutations.setflags(write=False)
+    inverse_permutations.setflags(write=False)
+    return permutations, inverse_permutations
+
+
+def _board_size(observations):
+    board_size = int(round(np.sqrt(observations.shape[-1])))
+    assert board_size ** 2 == observations.shape[-1], "observations must be flattened boards"
+    return board_size
+
+
+def augment(observations, actions=None):
+    """
+    all 8 symmetric copies of a batch of (observation, action) pairs,
+    the copies of sample i are rows 8 * i to 8 * i + 7
+    :param observations: (B, board_size ** 2), flattened board_state, a policy over the actions works as well
+    :param actions: (B,) actions of Discrete(board_size ** 2), optional
+    :return: observations (8 * B, board_size ** 2), actions (8 * B,) or None
+    """
+    observations = np.asarray(observations)
+    permutations, inverse_permutations = symmetry_permutations(_board_size(observations))
+    augmented = observations[:, permutations].reshape(-1, observations.shape[-1])
+    if actions is None:
+        return augmented, None
+    return augmented, inverse_permutations[:, np.asarray(actions)].T.reshape(-1)
+
+
+def canonicalize(observations):
+    """
+    pick the lexicographically smallest of the 8 symmetric copies, symmetric positions get the same result
+    :param observations: (B, board_size ** 2)
+    :return: canonical observations (B, board_size ** 2), transforms (B,) index of the symmetry used
+    """
+    observations = np.asarray(observations)
+    permutations, _ = symmetry_permutations(_board_size(observations))
+    candidates = observations[:, permutations]
+    samples = np.arange(len(observations))
+    best = candidates[:, 0]
+    transforms = np.zeros(len(observations), dtype=np.int64)
+    for k in range(1, NUMBER_OF_SYMMETRIES):
+        candidate = candidates[:, k]
+        different = candidate != best
+        first_difference = different.argmax(axis=1)
+        smaller = different.any(axis=1) & \
+            (candidate[samples, first_difference] < best[samples, first_difference])
+        best = np.where(smaller[:, np.newaxis], candidate, best)
+        transforms[smaller] = k
+    return best, transforms
+
+
+def transform_actions(actions, transforms, board_size):
+    """
+    :return: actions moved by the symmetries, e.g. to the canonical position given by canonicalize()
+    """
+    _, inverse_permutations = symmetry_permutations(board_size)
+    return inverse_permutations[transforms, actions]
+
+
+def inverse_transform_actions(actions, transforms, board_size):
+    """
+    :return: actions of the transformed positions moved back to the original positions
+    """
+    permutations, _ = symmetry_permutations(board_size)
+    return permutations[transforms, actions]
@@ -5,5 +5,6 @@ setup(name='Gomoku',
       install_requires=['gym', 'numpy', 'matplotlib',
                         'pytest', 'coverage',
                         'stable-baselines3',
-                        'pygame', 'pygame_widgets']
+                        'pygame', 'pygame_widgets'],
+      entry_points={'gym.envs': ['__root__ = gomoku:register_envs']}
 )
@@ -0,0 +1,101 @@
+import random
+
+import numpy as np
+import pytest
+
+from gomoku.envs.bitboard import BitBoard
+from gomoku.envs.board import Board, BoardPositionAlreadyTaken
+from gomoku.envs.boardUtils import StoneColor
+
+
+def test_BitBoard_init():
+    b = BitBoard()
+    assert b.board_size == 15
+    assert b.current_stone_color == StoneColor.black
+    assert b.black_bits == 0 and b.white_bits == 0
+    assert not b.board_state.any()
+    have_five, is_full = b.step([7, 7])
+    assert have_five is False
+    assert is_full is False
+    assert b.current_stone_color == StoneColor.white
+    assert b.board_state[7][7] == StoneColor.black.value
+
+
+def test_BitBoard_BoardPositionAlreadyTaken():
+    b = BitBoard()
+    b.step([7, 7])
+    with pytest.raises(BoardPositionAlreadyTaken):
+        b.step([7, 7])
+
+
+@pytest.mark.parametrize("line", [
+    [[i, 3] for i in range(10, 15)],          # along a column, touching the bottom edge
+    [[0, i] for i in range(10, 15)],          # along a row, touching the right edge
+    [[i, i] for i in range(5)],               # diagonal
+    [[i, 14 - i] for i in range(10, 15)],     # anti-diagonal, touching the corner
+])
+def test_BitBoard_five_in_a_row(line):
+    b = BitBoard()
+    for i, pos in enumerate(line):
+        have_five, _ = b.step(pos)
+        assert have_five is (i == 4)
+        if i < 4:
+            # white plays far away from the line
+            b.step([7 + (i % 2), 7 + i // 2])
+    assert b.current_stone_color == StoneColor.black
+
+
+def test_BitBoard_no_wrap_around():
+    # four stones at the end of row 0 and one at the start of row 1 are not a five
+    b = BitBoard()
+    for pos, white in zip([[0, 11], [0, 12], [0, 13], [0, 14], [1, 0]],
+                          [[7, 7], [8, 8], [9, 9], [10, 11], [11, 11]]):
+        have_five, _ = b.step(pos)
+        assert have_five is False
+        b.step(white)
+
+
+def test_BitBoard_matches_Board():
+    random.seed(0)
+    for board_size in [9, 15]:
+        for _ in range(5):
+            board, bit_board = Board(board_size), BitBoard(board_size)
+            positions = [[r, c] for r in range(board_size) for c in range(board_size)]
+            random.shuffle(positions)
+            for pos in positions:
+                result = board.step(pos)
+                assert bit_board.step(pos) == result
+                assert np.array_equal(bit_board.board_state, board.board_state)
+                assert bit_board.current_stone_color == board.current_stone_color
+                if result[0]:
+                    break
+
+
+def test_BitBoard_winning_positions():
+    b = BitBoard()
+    for black, white in zip([[7, 3], [7, 4], [7, 6], [2, 2]], [[0, 0], [0, 1], [0, 2], [5, 5]]):
+        b.step(black)
+        b.step(white)
+    assert b.winning_positions(StoneColor.black) == []
+    assert b.winning_positions(StoneColor.white) == []
+    b.step([7, 7])
+    # |X|X|_|X|X|
+    assert b.winning_positions(StoneColor.black) == [(7, 5)]
+    b.step([0, 3])
+    # white four in the corner, one end blocked by the board
+    assert b.winning_positions(StoneColor.white) == [(0, 4)]
+
+
+def test_BitBoard_from_board_state_copy():
+    board = Board()
+    for pos in [[7, 7], [7, 8], [8, 8]]:
+        board.step(pos)
+    b = BitBoard.from_board_state(board.board_state, board.current_stone_color)
+    assert np.array_equal(b.board_state, board.board_state)
+    assert b.current_stone_color == StoneColor.white
+    c = b.copy()
+    c.step([9, 9])
+    assert b.board_state[9][9] == 0
+    assert c.white_bits != b.white_bits and c.black_bits == b.black_bits
+    with pytest.raises(BoardPositionAlreadyTaken):
+        b.step([8, 8])
@@ -1,7 +1,9 @@
+import random
+
 import pytest
 
 from gomoku.envs.board import Board
-from gomoku.envs.boardUtils import Orientation, StoneColor
+from gomoku.envs.boardUtils import Orientation, StoneColor, stone_count_squared
 
 BLACK = StoneColor.black
 WHITE = StoneColor.white
@@ -27,6 +29,27 @@ def test_Pattern_end_stones():
     # board.render()
 
 
+def test_Pattern_interval():
+    board = Board()
+    # black |X|X|_|X|X|X| along the left diagonal, white elsewhere
+    for pos in [[3, 9], [0, 0], [4, 8], [0, 2], [6, 6], [0, 4], [7, 5], [0, 6], [8, 4], [0, 8]]:
+        board.step(pos)
+    patterns = [p for p in board.board_patterns.black_stone_patterns if p.orientation == Orientation.left_diagonal]
+    assert sorted((p.min_position, p.number_of_stones) for p in patterns) == [((3, 9), 2), ((6, 6), 3)]
+    # fill the gap, the two patterns are merged
+    board.step([5, 7])
+    pattern = board.stone_array[-1].find_pattern(Orientation.left_diagonal)
+    assert pattern.min_position == (3, 9)
+    assert pattern.max_position == (8, 4)
+    assert pattern.number_of_stones == 6
+    assert [stone.position for stone in pattern.stones] == [[3, 9], [4, 8], [5, 7], [6, 6], [7, 5], [8, 4]]
+    assert all(stone.find_pattern(Orientation.left_diagonal) is pattern for stone in pattern.stones)
+    board.undo()
+    assert sorted((p.min_position, p.number_of_stones) for p in patterns) == [((3, 9), 2), ((6, 6), 3)]
+    pattern = board.board_stone[8][4].find_pattern(Orientation.left_diagonal)
+    assert [stone.position for stone in pattern.stones] == [[6, 6], [7, 5], [8, 4]]
+
+
 def test_Pattern_end_stones_next_position():
     board = Board()
     board.step([7, 7])
@@ -82,3 +105,69 @@ def test_BoardPattern_update_patterns_end_free():
     # print(board.board_patterns.black_stone_patterns)
     # print(board.board_patterns.white_stone_patterns)
     # board.render()
+
+
+def test_BoardPattern_incremental_update():
+    random.seed(0)
+    for _ in range(100):
+        board = Board(9)
+        positions = [[r, c] for r in range(9) for c in range(9)]
+        random.shuffle(positions)
+        for pos in positions:
+            have_five, _ = board.step(pos)
+            for patterns in [board.board_patterns.black_stone_patterns,
+                             board.board_patterns.white_stone_patterns]:
+                # sorted() is stable, an up to date list is left untouched
+                assert [id(p) for p in sorted(patterns, reverse=True)] == [id(p) for p in patterns]
+            all_patterns = board.board_patterns.black_stone_patterns + board.board_patterns.white_stone_patterns
+            assert have_five == any(pattern.number_of_stones >= 5 for pattern in all_patterns)
+            if have_five:
+                break
+
+
+def test_BoardPattern_pattern_table():
+    random.seed(3)
+    board = Board(9)
+    positions = [[r, c] for r in range(9) for c in range(9)]
+    random.shuffle(positions)
+    for pos in positions[:40]:
+        board.step(pos)
+    stone = board.stone_array[-1]
+    assert not hasattr(stone, '__dict__')
+    assert not hasattr(board.board_patterns.black_stone_patterns[0], '__dict__')
+    for stone in board.stone_array:
+        patterns = stone.patterns
+        assert len(patterns) > 0
+        for pattern in patterns:
+            assert stone.find_pattern(pattern.orientation) is pattern
+            assert stone in pattern.stones
+    # every pattern of the board is found from its stones
+    for patterns in [board.board_patterns.black_stone_patterns, board.board_patterns.white_stone_patterns]:
+        for pattern in patterns:
+            assert all(stone.find_pattern(pattern.orientation) is pattern for stone in pattern.stones)
+
+
+def test_BoardPattern_shaping_total():
+    def shaping(number_of_stones, free_end_number):
+        return number_of_stones * (free_end_number + 1)
+
+    random.seed(5)
+    for board, board_shaping in [(Board(9), stone_count_squared), (Board(9, shaping), shaping)]:
+        positions = [[r, c] for r in range(9) for c in range(9)]
+        random.shuffle(positions)
+        totals = []
+        for pos in positions[:60]:
+            board_patterns = board.board_patterns
+            totals.append([board_patterns.shaping_total(color) for color in [BLACK, WHITE]])
+            have_five, _ = board.step(pos)
+            for c, index in [(BLACK, 0), (WHITE, 1)]:
+                patterns = board_patterns.black_stone_patterns if c == BLACK else board_patterns.white_stone_patterns
+                expected = sum(board_shaping(p.number_of_stones, p.free_end_number) for p in patterns)
+                assert board_patterns.shaping_total(c) == expected
+                assert board_patterns.shaping_delta(c) == expected - totals[-1][index]
+            if have_five:
+                break
+        # undo restores every total
+        while totals:
+            board.undo()
+            assert [board.board_patterns.shaping_total(color) for color in [BLACK, WHITE]] == totals.pop()
@@ -1,7 +1,10 @@
+import pickle
+import random
+
 import pytest
 
-from gomoku.envs.board import Board
-from gomoku.envs.boardUtils import Orientation, StoneColor
+from gomoku.envs.board import Board, BoardPositionAlreadyTaken, NoStoneToUndo
+from gomoku.envs.boardUtils import Orientation, StoneColor, zobrist_keys
 
 BLACK = StoneColor.black
 WHITE = StoneColor.white
@@ -185,3 +188,240 @@ def test_Board_render():
     print(b.board_patterns.black_stone_patterns[0])
 
 # coverage run -m pytest; coverage html
+
+
+def _board_signature(board):
+    black, white = board.board_patterns.black_stone_patterns, board.board_patterns.white_stone_patterns
+    return (board.board_state.tolist(),
+            [[id(stone) for stone in row] for row in board.board_stone],
+            [id(stone) for stone in board.stone_array],
+            board.current_stone_color,
+            board.board_patterns.five_stones_found,
+            [(id(pattern), repr(pattern), [id(stone) for stone in pattern.stones]) for pattern in black + white],
+            [[id(pattern) for pattern in stone.patterns] for stone in board.stone_array],
+            list(board.empty_cells))
+
+
+def test_Board_undo():
+    random.seed(0)
+    for _ in range(20):
+        board = Board(9)
+        positions = [[r, c] for r in range(9) for c in range(9)]
+        random.shuffle(positions)
+        signatures = [_board_signature(board)]
+        for pos in positions:
+            have_five, is_full = board.step(pos)
+            signatures.append(_board_signature(board))
+            if have_five or is_full:
+                break
+        for signature in reversed(signatures[:-1]):
+            board.undo()
+            assert _board_signature(board) == signature
+        with pytest.raises(NoStoneToUndo):
+            board.undo()
+
+
+def test_Board_push():
+    board = Board()
+    board.step([7, 7])
+    signature = _board_signature(board)
+    with board.push([7, 8]) as (have_five, is_full):
+        assert have_five is False and is_full is False
+        assert board.board_state[7][8] == WHITE.value
+        assert board.current_stone_color == BLACK
+    assert _board_signature(board) == signature
+    with pytest.raises(BoardPositionAlreadyTaken):
+        with board.push([7, 7]):
+            pass
+    assert _board_signature(board) == signature
+
+
+def _full_hash_key(board):
+    keys, side_key = zobrist_keys(board.board_size)
+    hash_key = side_key if board.current_stone_color == WHITE else 0
+    for stone in board.stone_array:
+        row, col = stone.position
+        hash_key ^= keys[stone.color][row * board.board_size + col]
+    return hash_key
+
+
+def test_Board_hash_key():
+    board = Board()
+    assert board.hash_key == 0
+    board.step([7, 7])
+    board.step([7, 8])
+    hash_key = board.hash_key
+    assert hash_key == _full_hash_key(board)
+    board.step([8, 8])
+    assert board.hash_key == _full_hash_key(board)
+    assert board.hash_key != hash_key
+    # same stones in another order give the same key, the black moves are swapped
+    other = Board()
+    other.step([8, 8])
+    other.step([7, 8])
+    other.step([7, 7])
+    assert other.hash_key == board.hash_key
+    assert other.board_state.tolist() == board.board_state.tolist()
+    board.undo()
+    assert board.hash_key == hash_key
+    # the color to move is part of the key
+    board.undo()
+    assert board.hash_key == _full_hash_key(board)
+    assert board.hash_key != Board().hash_key ^ zobrist_keys(15)[0][BLACK][7 * 15 + 7]
+
+
+def test_Board_hash_key_game_end():
+    board = Board()
+    for i in range(5):
+        board.step([i, 0])
+        if i < 4:
+            board.step([i, 5])
+    assert board.board_patterns.five_stones_found
+    assert board.hash_key == _full_hash_key(board)
+    board.undo()
+    assert board.hash_key == _full_hash_key(board)
+
+
+def test_Board_empty_cells():
+    random.seed(1)
+    board = Board(9)
+    assert sorted(board.empty_cells) == list(range(81))
+    positions = [[r, c] for r in range(9) for c in range(9)]
+    random.shuffle(positions)
+    for pos in positions[:30]:
+        board.step(pos)
+        assert pos[0] * 9 + pos[1] not in board.empty_cells
+    assert sorted(board.empty_cells) == sorted(r * 9 + c for r, c in zip(*(board.board_state == 0).nonzero()))
+    assert len(board.empty_cells) == 51
+    board.undo()
+    assert positions[29][0] * 9 + positions[29][1] in board.empty_cells
+    assert len(board.empty_cells) == 52
+
+
+def test_Board_frontier():
+    def near_cells(board, distance):
+        state = board.board_state
+        return sorted(r * 9 + c for r in range(9) for c in range(9) if state[r][c] == 0 and
+                      (state[max(r - distance, 0):r + distance + 1, max(c - distance, 0):c + distance + 1] != 0).any())
+
+    random.seed(4)
+    for distance in [1, 2]:
+        board = Board(9, frontier_distance=distance)
+        assert board.frontier_distance == distance
+        assert len(board.frontier) == 0
+        positions = [[r, c] for r in range(9) for c in range(9)]
+        random.shuffle(positions)
+        frontiers = []
+        for pos in positions[:40]:
+            frontiers.append(list(board.frontier))
+            board.step(pos)
+            assert sorted(board.frontier) == near_cells(board, distance)
+        # undo restores the exact order of the frontier
+        while frontiers:
+            board.undo()
+            assert list(board.frontier) == frontiers.pop()
+        # restore() and clone() build the same frontier
+        for pos in positions[:20]:
+            board.step(pos)
+        restored = Board(9, frontier_distance=distance)
+        restored.restore(board.snapshot())
+        assert sorted(restored.frontier) == sorted(board.clone().frontier) == near_cells(board, distance)
+        restored.undo()
+        assert sorted(restored.frontier) == near_cells(restored, distance)
+
+
+def test_Board_legal_action_mask():
+    random.seed(2)
+    board = Board(9)
+    mask = board.legal_action_mask
+    assert mask.all()
+    with pytest.raises(ValueError):
+        mask[0] = False
+    positions = [[r, c] for r in range(9) for c in range(9)]
+    random.shuffle(positions)
+    for pos in positions[:40]:
+        board.step(pos)
+        assert (mask == (board.board_state == 0).flatten()).all()
+    for _ in range(10):
+        board.undo()
+        assert (mask == (board.board_state == 0).flatten()).all()
+    board.reset()
+    assert board.legal_action_mask.all()
+
+
+def test_Board_snapshot_restore():
+    random.seed(4)
+    board = Board()
+    positions = [[r, c] for r in range(15) for c in range(15)]
+    random.shuffle(positions)
+    for pos in positions[:100]:
+        board.step(pos)
+    snapshot = board.snapshot()
+    assert len(pickle.dumps(snapshot)) < 400
+
+    restored = Board()
+    restored.step([0, 0])
+    restored.restore(pickle.loads(pickle.dumps(snapshot)))
+    # flat state is set right away, stones and patterns are rebuilt on use
+    assert restored._pending_rebuild
+    assert (restored.board_state == board.board_state).all()
+    assert restored.hash_key == board.hash_key
+    assert restored.current_stone_color == board.current_stone_color
+    assert (restored.legal_action_mask == board.legal_action_mask).all()
+    assert restored._pending_rebuild
+    assert [repr(p) for p in restored.board_patterns.black_stone_patterns] == \
+        [repr(p) for p in board.board_patterns.black_stone_patterns]
+    assert not restored._pending_rebuild
+    assert list(restored.empty_cells) == list(board.empty_cells)
+    for pos in positions[100:110]:
+        assert restored.step(pos) == board.step(pos)
+    assert restored.hash_key == board.hash_key
+    for _ in range(110):
+        restored.undo()
+    assert restored.hash_key == 0
+    with pytest.raises(ValueError):
+        Board(9).restore(snapshot)
+
+
+def test_Board_clone():
+    random.seed(5)
+    board = Board(9)
+    positions = [[r, c] for r in range(9) for c in range(9)]
+    random.shuffle(positions)
+    for pos in positions[:30]:
+        board.step(pos)
+    clone = board.clone()
+    assert (clone.board_state == board.board_state).all()
+    assert clone.hash_key == board.hash_key
+    # the copies are independent
+    clone.step(positions[30])
+    assert board.board_state[positions[30][0]][positions[30][1]] == 0
+    clone.undo()
+    assert [repr(stone) for stone in clone.stone_array] == [repr(stone) for stone in board.stone_array]
+    assert [repr(p) for p in clone.board_patterns.white_stone_patterns] == \
+        [repr(p) for p in board.board_patterns.white_stone_patterns]
+    assert (clone.board_shapes.shapes(StoneColor.black) == board.board_shapes.shapes(StoneColor.black)).all()
+    assert Board(9).clone().board_patterns.black_stone_patterns == []
+
+
+def test_Board_views_stay_valid():
+    random.seed(6)
+    board = Board(9)
+    positions = [[r, c] for r in range(9) for c in range(9)]
+    random.shuffle(positions)
+    for pos in positions[:10]:
+        board.step(pos)
+    restored = Board(9)
+    for other in [board.clone(), restored]:
+        flat_board_state, legal_action_mask = other.flat_board_state, other.legal_action_mask
+        if other is restored:
+            restored.restore(board.snapshot())
+        # the first step rebuilds the stones and patterns
+        other.step(positions[10])
+        cell = positions[10][0] * 9 + positions[10][1]
+        assert flat_board_state[cell] == other.current_stone_color.next().value
+        assert not legal_action_mask[cell]
+        assert (flat_board_state == other.flat_board_state).all()
+        assert (legal_action_mask == other.legal_action_mask).all()
+        other.reset()
+        assert not flat_board_state.any() and legal_action_mask.all()
@@ -0,0 +1,113 @@
+import functools
+import pickle
+
+import numpy as np
+from gomoku.book import BookAgent, OpeningBook, build_book, canonical_hash, main
+from gomoku.envs.board import Board
+from gomoku.envs.boardUtils import StoneColor
+from gomoku.envs.opponent import EasyAgent, RandomAgent
+from gomoku.record import GameRecord, GameRecordWriter
+from gomoku.selfplay import play_game
+from gomoku.symmetry import symmetry_permutations
+
+
+def _games():
+    return [play_game(EasyAgent, RandomAgent, board_size=9, seed=seed) for seed in range(10)]
+
+
+def test_canonical_hash():
+    board = Board(9)
+    for move in [[4, 4], [3, 5], [2, 2], [6, 1]]:
+        board.step(move)
+    permutations, _ = symmetry_permutations(9)
+    hashes = set()
+    for permutation in permutations:
+        board_state = board.board_state.reshape(-1)[permutation].reshape(9, 9)
+        hashes.add(canonical_hash(board_state, board.current_stone_color)[0])
+    assert len(hashes) == 1
+    assert canonical_hash(board.board_state, StoneColor.white)[0] not in hashes
+    # the smallest of the hashes, the board itself has the identity one
+    assert canonical_hash(board.board_state, board.current_stone_color)[0] <= board.hash_key
+
+
+def test_build_book():
+    games = _games()
+    book = OpeningBook(build_book(games, max_ply=4))
+    entries = book.entries
+    assert np.all(entries['hash'][:-1] <= entries['hash'][1:])
+    assert entries['count'].sum() == 4 * len(games)
+    # EasyAgent starts in the middle
+    assert book.moves(np.zeros((9, 9), dtype=np.int8), StoneColor.black) == \
+        [((4, 4), len(games), sum(game.result for game in games))]
+    # every position of the games is found, also on a symmetric board
+    permutations, inverse_permutations = symmetry_permutations(9)
+    for game in games:
+        board_state = np.zeros(81, dtype=np.int8)
+        color = StoneColor.black
+        for move in game.moves[:4].tolist():
+            for k in range(8):
+                transformed = board_state[permutations[k]]
+                moves = [row * 9 + col for (row, col), _, _ in book.moves(transformed.reshape(9, 9), color)]
+                # up to the symmetries of the position itself
+                equivalent = {int(inverse_permutations[j, book_move]) for j in range(8) for book_move in moves
+                              if np.array_equal(transformed[permutations[j]], transformed)}
+                assert int(inverse_permutations[k, move]) in equivalent
+            board_state[move] = color.value
+            color = color.next()
+    assert book.moves(board_state.reshape(9, 9), color.next()) == []
+    assert len(OpeningBook(build_book(games, max_ply=4, min_count=len(games)))) == 1
+
+
+def test_OpeningBook_choose():
+    games = [GameRecord(9, np.array(moves, dtype=np.uint16), result, None, "a", "b")
+             for moves, result in [([40, 41], 1), ([40, 41], 1), ([40, 31], -1)]]
+    book = OpeningBook(build_book(games))
+    board = Board(9)
+    board.step([4, 4])
+    assert book.choose(board.board_state, board.current_stone_color, randomness=False) == (3, 4)
+    assert book.choose(board.board_state, board.current_stone_color, min_count=2) == (4, 5)
+    assert book.choose(board.board_state, board.current_stone_color, min_count=3) is None
+    for _ in range(10):
+        assert book.choose(board.board_state, board.current_stone_color) in [(4, 5), (3, 4)]
+
+
+def test_OpeningBook_save_load(tmp_path):
+    path = str(tmp_path / "book.npy")
+    book = OpeningBook(build_book(_games()))
+    book.save(path)
+    loaded = OpeningBook.load(path)
+    assert isinstance(loaded.entries, np.memmap)
+    assert not loaded.entries.flags.writeable
+    assert np.array_equal(loaded.entries, book.entries)
+    # pickled as the path, the copy maps the same file
+    copy = pickle.loads(pickle.dumps(loaded))
+    assert isinstance(copy.entries, np.memmap)
+    assert len(pickle.dumps(loaded)) < 200
+    assert np.array_equal(pickle.loads(pickle.dumps(book)).entries, book.entries)
+
+
+def test_BookAgent():
+    games = _games()
+    book = OpeningBook(build_book(games, max_ply=2))
+    board = Board(9)
+    agent = BookAgent(board, StoneColor.black, book=book, agent_class=RandomAgent)
+    assert agent.predict()[0] == [4, 4]
+    assert agent.book_moves == 1
+    board.step([0, 0])
+    board.step([0, 1])
+    # out of the book
+    agent.predict()
+    assert agent.book_moves == 1
+    game = play_game(functools.partial(BookAgent, book=book), RandomAgent, board_size=9, seed=0)
+    assert game.black == "BookAgent"
+    assert game.moves[0] == 40
+
+
+def test_main(tmp_path):
+    games_path = str(tmp_path / "games.bin")
+    book_path = str(tmp_path / "book.npy")
+    with GameRecordWriter(games_path) as writer:
+        for game in _games():
+            writer.write(game)
+    main([games_path, book_path, "--max-ply", "3"])
+    assert OpeningBook.load(book_path).entries['count'].sum() == 30
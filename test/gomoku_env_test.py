@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 import gym
 from stable_baselines3.common.env_checker import check_env
@@ -24,13 +25,64 @@ def test_env_step():
     assert obs.shape == (15 ** 2,)
     assert reward == 1
     assert done is False
-    assert info == {}
+    assert list(info) == ["action_mask"]
+    assert info["action_mask"].sum() == 15 ** 2 - 2
+    assert not info["action_mask"][7 * 15 + 7]
     # env.render()
 
 
+def test_env_action_masks():
+    env = GomokuEnv()
+    assert env.action_masks().all()
+    obs, _, _, info = env.step(112)
+    mask = env.action_masks()
+    assert mask.dtype == bool
+    assert (mask == (obs == 0)).all()
+    assert (info["action_mask"] == mask).all()
+    # copies, a later step does not change them
+    env.step(int(mask.argmax()))
+    assert mask.sum() == 15 ** 2 - 2
+    env.reset()
+    assert env.action_masks().all()
+
+
 def test_env_BoardPositionAlreadyTaken():
     env = GomokuEnv()
     env.step([7, 7])
     _, _, done, _ = env.step([7, 7])
     assert done is True
     env.render()
+
+
+def test_env_flat_observation():
+    env = GomokuEnv()
+    obs = env.reset()
+    assert obs.dtype == np.int8
+    assert obs.shape == env.observation_space.shape
+    with pytest.raises(ValueError):
+        obs[0] = 1
+    # view of the board, updated in place
+    env.step(112)
+    assert obs[112] == 1
+    assert np.shares_memory(obs, env.board.board_state)
+
+
+def test_env_plane_observation():
+    env = GomokuEnv(observation_mode='planes', history=2)
+    obs = env.reset()
+    assert obs.shape == env.observation_space.shape == (5, 15, 15)
+    assert obs[2].all() and not obs[[0, 1, 3, 4]].any()
+    obs, _, _, _ = env.step([7, 7])
+    black_move = env.board.stone_array[0].position
+    white_move = env.board.stone_array[1].position
+    assert (obs[0] == (env.board.board_state == 1)).all()
+    assert (obs[1] == (env.board.board_state == -1)).all()
+    # black, the agent, is to move
+    assert obs[2].all()
+    assert obs[3].sum() == 1 and obs[3][white_move[0], white_move[1]] == 1
+    assert obs[4].sum() == 1 and obs[4][black_move[0], black_move[1]] == 1
+    env.step(int(np.flatnonzero(env.board.flat_board_state == 0)[0]))
+    assert obs[3].sum() == 1 and obs[4].sum() == 1
+    assert (obs[0] == (env.board.board_state == 1)).all()
+    env.reset()
+    assert not obs[[0, 1, 3, 4]].any()
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+# modules a headless self-play worker imports
+WORKER_MODULES = ['gomoku', 'gomoku.envs.board', 'gomoku.envs.opponent', 'gomoku.selfplay', 'gomoku.record']
+
+IMPORT_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+for module in sys.argv[1:]:
+    __import__(module)
+print(time.perf_counter() - start)
+print(' '.join(sorted({m.split('.')[0] for m in sys.modules if m.split('.')[0] in ('matplotlib', 'gym', 'stable_baselines3')})))
+"""
+
+
+def test_import_without_plotting():
+    output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT] + WORKER_MODULES,
+                            capture_output=True, text=True, check=True).stdout.split('\n')
+    # numpy is most of it
+    assert float(output[0]) < 1.0
+    # gym is loaded to register gomoku-v0
+    assert output[1] == 'gym'
+
+
+def test_gym_make_after_import():
+    script = "import gomoku; import gym; print(type(gym.make('gomoku-v0').unwrapped).__name__)"
+    output = subprocess.run([sys.executable, '-W', 'ignore', '-c', script], capture_output=True, text=True,
+                            check=True, env=dict(os.environ, MPLBACKEND='Agg')).stdout
+    assert output.strip().split('\n')[-1] == 'GomokuEnv'
+
+
+def test_render_imports_matplotlib():
+    script = "import sys, gomoku.render; print('matplotlib' in sys.modules)"
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                            env=dict(os.environ, MPLBACKEND='Agg')).stdout
+    assert output.strip() == 'True'
@@ -1,7 +1,13 @@
+import functools
+import time
+
+import numpy as np
 import pytest
 from gomoku.envs import GomokuEnv
+from gomoku.envs.board import Board
 from gomoku.envs.boardUtils import StoneColor
-from gomoku.envs.opponent import RandomAgent, EasyAgent
+from gomoku.envs.opponent import RandomAgent, EasyAgent, MinimaxAgent, MCTSAgent, CachedAgent, PredictionCache, \
+    WIN_SCORE
 
 
 def test_RandomAgent():
@@ -18,6 +24,15 @@ def test_RandomAgent():
     # env.render()
 
 
+def test_RandomAgent_almost_full_board():
+    board = Board(5)
+    # fill every position but the last one
+    for pos in [[r, c] for r in range(5) for c in range(5)][:-1]:
+        board.step(pos)
+    agent = RandomAgent(board, board.current_stone_color)
+    assert agent.predict()[0] == [4, 4]
+
+
 def test_EasyAgent():
     env = GomokuEnv()
     opponent = EasyAgent(env.board, StoneColor.white, randomness=False)
@@ -30,3 +45,186 @@ def test_EasyAgent():
     # print("")
     # print(env.board.board_patterns)
     # print(env.board.stone_array[7])
+
+
+def _play(board, positions):
+    for position in positions:
+        board.step(position)
+
+
+def test_EasyAgent_frontier():
+    board = Board(9)
+    # single white stones with no free end to extend
+    _play(board, [[0, 0], [4, 4], [8, 8], [0, 8]])
+    for randomness in [False, True]:
+        agent = EasyAgent(board, StoneColor.black, randomness=randomness)
+        for _ in range(20):
+            row, col = agent.predict()[0]
+            assert row * 9 + col in board.frontier
+            # next to a black stone
+            assert (board.board_state[max(row - 1, 0):row + 2, max(col - 1, 0):col + 2] == 1).any()
+
+
+def test_MinimaxAgent_win_and_defend():
+    board = Board()
+    # black has four in a row, black to move
+    _play(board, [[7, 3], [9, 3], [7, 4], [9, 4], [7, 5], [9, 5], [7, 6], [10, 10]])
+    agent = MinimaxAgent(board, StoneColor.black, randomness=False, max_depth=3)
+    action, _ = agent.predict()
+    assert action in [[7, 2], [7, 7]]
+
+    board = Board()
+    # white has an open three, black has nothing better and must block it
+    _play(board, [[0, 0], [7, 5], [0, 14], [7, 6], [14, 0], [7, 7]])
+    agent = MinimaxAgent(board, StoneColor.black, randomness=False, max_depth=3)
+    action, _ = agent.predict()
+    assert action in [[7, 4], [7, 8]]
+
+
+def test_MinimaxAgent_table_mate_scores():
+    board = Board()
+    # black has an open three, the open four wins two plies later
+    _play(board, [[7, 4], [0, 0], [7, 5], [0, 14], [7, 6], [14, 0]])
+    agent = MinimaxAgent(board, StoneColor.black, randomness=False, max_depth=3)
+    action, _ = agent.predict()
+    assert action in [[7, 3], [7, 7]]
+    board.step(action)
+    # stored at ply 1, white loses to the five two plies after the position, whatever its ply
+    _, score, _, _ = agent._transposition_table[board.hash_key]
+    assert score == -(WIN_SCORE - 2)
+    # read back at the ply the position is reached
+    assert agent._from_table_score(score, 0) == -(WIN_SCORE - 2)
+    assert agent._from_table_score(score, 2) == -(WIN_SCORE - 4)
+
+
+def test_MinimaxAgent_restores_board():
+    board = Board()
+    _play(board, [[7, 7], [7, 8], [8, 8], [6, 6]])
+    state = board.board_state.copy()
+    hash_key = board.hash_key
+    black_patterns = repr(board.board_patterns.black_stone_patterns)
+    agent = MinimaxAgent(board, StoneColor.black, max_depth=3, time_limit=0.5)
+    agent.predict()
+    assert (board.board_state == state).all()
+    assert board.hash_key == hash_key
+    assert repr(board.board_patterns.black_stone_patterns) == black_patterns
+
+
+def test_MinimaxAgent_time_limit():
+    board = Board()
+    _play(board, [[7, 7], [7, 8], [8, 8], [6, 6], [9, 9], [5, 5]])
+    agent = MinimaxAgent(board, StoneColor.black, max_depth=10, time_limit=0.2)
+    start = time.perf_counter()
+    agent.predict()
+    assert time.perf_counter() - start < 1.0
+    assert agent.nodes > 0
+
+
+def test_MinimaxAgent_env():
+    env = GomokuEnv(board_size=9, opponent_class=MinimaxAgent)
+    env.opponent = MinimaxAgent(env.board, StoneColor.white, max_depth=2, time_limit=0.1)
+    _, _, done, _ = env.step([4, 4])
+    assert done is False
+    assert (env.board.board_state == StoneColor.white.value).sum() == 1
+
+
+def test_PredictionCache():
+    cache = PredictionCache(max_entries=2)
+    cache.put(1, (0, 0))
+    cache.put(2, (0, 1))
+    assert cache.get(1) == (0, 0)
+    # 2 is the least recently used
+    cache.put(3, (0, 2))
+    assert len(cache) == 2
+    assert cache.get(2) is None
+    assert cache.get(3) == (0, 2)
+    assert (cache.hits, cache.misses) == (2, 1)
+    cache.clear()
+    assert (len(cache), cache.hits, cache.misses) == (0, 0, 0)
+
+
+def test_CachedAgent():
+    board = Board(9)
+    _play(board, [[4, 4], [4, 5], [5, 5], [3, 3]])
+    cache = PredictionCache()
+    minimax_class = functools.partial(MinimaxAgent, max_depth=2, time_limit=5)
+    agent = CachedAgent(board, StoneColor.black, randomness=False, cache=cache, agent_class=minimax_class)
+    move = agent.predict()[0]
+    assert (cache.hits, cache.misses, len(cache)) == (0, 1, 1)
+    # the same position in another game, from another agent of the same class sharing the cache
+    other_board = Board(9)
+    _play(other_board, [[5, 5], [3, 3], [4, 4], [4, 5]])
+    other = CachedAgent(other_board, StoneColor.black, randomness=False, cache=cache, agent_class=minimax_class)
+    assert other.predict()[0] == move
+    assert (cache.hits, cache.misses) == (1, 1)
+    # the moves of an agent with randomness are not cached
+    random_agent = CachedAgent(board, StoneColor.black, randomness=True, cache=cache, agent_class=RandomAgent)
+    random_agent.predict()
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+    # another class does not read the moves of minimax_class
+    random_agent = CachedAgent(board, StoneColor.black, randomness=True, cache=cache, agent_class=RandomAgent,
+                               cache_random=True)
+    random_move = random_agent.predict()[0]
+    assert (cache.hits, cache.misses, len(cache)) == (1, 2, 2)
+    assert random_agent.predict()[0] == random_move
+    assert cache.hits == 2
+
+
+def test_MCTSAgent_win_and_defend():
+    board = Board()
+    _play(board, [[7, 3], [9, 3], [7, 4], [9, 4], [7, 5], [9, 5], [7, 6], [10, 10]])
+    agent = MCTSAgent(board, StoneColor.black, randomness=False, playouts=300)
+    action, _ = agent.predict()
+    assert action in [[7, 2], [7, 7]]
+
+    board = Board()
+    # white has four in a row, black has to block
+    _play(board, [[0, 0], [7, 4], [0, 14], [7, 5], [14, 0], [7, 6], [14, 14], [7, 7]])
+    agent = MCTSAgent(board, StoneColor.black, randomness=False, playouts=300)
+    action, _ = agent.predict()
+    assert action in [[7, 3], [7, 8]]
+
+
+def test_MCTSAgent_time_limit():
+    board = Board(9)
+    _play(board, [[4, 4], [4, 5]])
+    agent = MCTSAgent(board, StoneColor.black, playouts=None, time_limit=0.2)
+    start = time.perf_counter()
+    action, _ = agent.predict()
+    assert time.perf_counter() - start < 1.0
+    assert board.board_state[action[0]][action[1]] == 0
+    assert agent.root.visits > 1
+    with pytest.raises(ValueError):
+        MCTSAgent(board, StoneColor.black, playouts=None)
+
+
+def test_MCTSAgent_tree_reuse():
+    board = Board(9)
+    agent = MCTSAgent(board, StoneColor.black, playouts=200)
+    _play(board, [[4, 4], [4, 5]])
+    action, _ = agent.predict()
+    board.step(action)
+    reply, reply_node = next(iter(agent.root.children.items()))
+    visits = reply_node.visits
+    board.step(list(reply))
+    agent.predict()
+    # the subtree of the reply was reused
+    assert reply_node.visits >= visits + 200
+    assert agent.root in reply_node.children.values()
+
+
+def test_MCTSAgent_evaluator():
+    calls = []
+
+    def evaluator(observations):
+        calls.append(len(observations))
+        policies = np.ones(observations.shape) / observations.shape[1]
+        return policies, np.zeros(len(observations))
+
+    board = Board(9)
+    _play(board, [[4, 4], [4, 5]])
+    agent = MCTSAgent(board, StoneColor.black, playouts=64, evaluator=evaluator, batch_size=8)
+    action, _ = agent.predict()
+    assert board.board_state[action[0]][action[1]] == 0
+    assert max(calls) > 1
+    assert agent.root is not None
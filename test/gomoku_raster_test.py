@@ -0,0 +1,51 @@
+import random
+
+import numpy as np
+import pytest
+from gomoku.envs import GomokuEnv
+from gomoku.envs.board import Board
+from gomoku.raster import BoardRasterizer, LAST_MOVE_COLOR, STONE_COLORS
+
+
+def test_BoardRasterizer_render():
+    rasterizer = BoardRasterizer(9, cell_size=20)
+    board_state = np.zeros((9, 9), dtype=int)
+    frame = rasterizer.render(board_state)
+    assert frame.shape == rasterizer.shape == (180, 180, 3)
+    assert frame.dtype == np.uint8
+    board_state[2, 3] = 1
+    board_state[4, 4] = -1
+    frame = rasterizer.render(board_state, (4, 4))
+    # marker at the center of the last move, stone colors around it
+    assert tuple(frame[4 * 20 + 10, 4 * 20 + 10]) == LAST_MOVE_COLOR
+    assert tuple(frame[4 * 20 + 10, 4 * 20 + 5]) == STONE_COLORS[-1]
+    assert tuple(frame[2 * 20 + 10, 3 * 20 + 10]) == STONE_COLORS[1]
+    # the returned frames are copies
+    frame[:] = 0
+    assert rasterizer.render(board_state, (4, 4)).any()
+
+
+def test_BoardRasterizer_incremental():
+    random.seed(0)
+    board = Board(9)
+    frames = []
+    positions = [[r, c] for r in range(9) for c in range(9)]
+    random.shuffle(positions)
+    for pos in positions[:20]:
+        board.step(pos)
+        frames.append(board.render('rgb_array'))
+        # same frame as drawing the whole board from scratch
+        assert np.array_equal(frames[-1], BoardRasterizer(9).render(board.board_state, board.last_move))
+    board.undo()
+    assert np.array_equal(board.render('rgb_array'), frames[-2])
+    board.reset()
+    assert np.array_equal(board.render('rgb_array'), BoardRasterizer(9).render(board.board_state))
+    with pytest.raises(ValueError):
+        board.render('ansi')
+
+
+def test_GomokuEnv_render_rgb_array():
+    env = GomokuEnv()
+    env.step([7, 7])
+    frame = env.render('rgb_array')
+    assert frame.shape == (15 * 32, 15 * 32, 3)
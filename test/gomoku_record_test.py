@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pytest
+
+from gomoku.envs.opponent import EasyAgent, RandomAgent
+from gomoku.record import GameRecord, GameRecordReader, GameRecordWriter, INDEX_SUFFIX, NAME_BYTES
+from gomoku.selfplay import main, play_game
+
+
+def _games():
+    return [play_game(EasyAgent, RandomAgent, board_size=9, seed=seed) for seed in range(5)] + \
+           [GameRecord(19, np.array([0, 360, 200], dtype=np.uint16), 0, None, "RandomAgent", "EasyAgent")]
+
+
+def test_GameRecordWriter_Reader(tmp_path):
+    path = str(tmp_path / "games.bin")
+    games = _games()
+    with GameRecordWriter(path) as writer:
+        for game in games[:3]:
+            writer.write(game)
+    # appending to the same file
+    with GameRecordWriter(path) as writer:
+        for game in games[3:]:
+            writer.write(game)
+    reader = GameRecordReader(path)
+    assert len(reader) == len(games)
+    for game, read_game in zip(games, reader):
+        assert read_game.board_size == game.board_size
+        assert np.array_equal(read_game.moves, game.moves)
+        assert (read_game.result, read_game.seed, read_game.black, read_game.white) == \
+               (game.result, game.seed, game.black, game.white)
+    assert reader[0].moves.dtype == np.uint8
+    assert reader[5].moves.dtype == np.uint16
+
+
+def test_GameRecordWriter_long_name(tmp_path):
+    path = str(tmp_path / "games.bin")
+    moves = np.array([40], dtype=np.uint16)
+    with GameRecordWriter(path) as writer:
+        writer.write(GameRecord(9, moves, 0, None, "a" * NAME_BYTES, "b"))
+        # names are not cut, nothing is written
+        with pytest.raises(ValueError):
+            writer.write(GameRecord(9, moves, 0, None, "a", "b" * (NAME_BYTES + 1)))
+    reader = GameRecordReader(path)
+    assert len(reader) == 1
+    assert reader[0].black == "a" * NAME_BYTES
+
+
+def test_GameRecordReader_without_index(tmp_path):
+    path = str(tmp_path / "games.bin")
+    games = _games()
+    with GameRecordWriter(path) as writer:
+        for game in games:
+            writer.write(game)
+    os.remove(path + INDEX_SUFFIX)
+    reader = GameRecordReader(path)
+    assert [len(game.moves) for game in reader] == [len(game.moves) for game in games]
+
+
+@pytest.mark.parametrize("with_index", [True, False])
+def test_GameRecordReader_partly_written(tmp_path, with_index):
+    path = str(tmp_path / "games.bin")
+    games = _games()[:3]
+    with GameRecordWriter(path) as writer:
+        for game in games:
+            writer.write(game)
+    with open(path, 'rb') as data_file:
+        data = data_file.read()
+    if not with_index:
+        os.remove(path + INDEX_SUFFIX)
+    # a torn header after the last game
+    with open(path, 'wb') as data_file:
+        data_file.write(data + b'\x0f\x01')
+    assert [len(game.moves) for game in GameRecordReader(path)] == [len(game.moves) for game in games]
+    # the moves of the last game cut off, the index has its offset
+    with open(path, 'wb') as data_file:
+        data_file.write(data[:-5])
+    assert [len(game.moves) for game in GameRecordReader(path)] == [len(game.moves) for game in games[:2]]
+
+
+def test_GameRecordReader_sample_positions(tmp_path):
+    path = str(tmp_path / "games.bin")
+    games = _games()[:5]
+    with GameRecordWriter(path) as writer:
+        for game in games:
+            writer.write(game)
+    observations, actions, results = GameRecordReader(path).sample_positions(50, np.random.default_rng(0))
+    assert observations.shape == (50, 81)
+    stones = (observations != 0).sum(axis=1)
+    black_to_move = stones % 2 == 0
+    assert ((observations == 1).sum(axis=1) - (observations == -1).sum(axis=1) == ~black_to_move).all()
+    # the action is an empty position
+    assert (observations[np.arange(50), actions] == 0).all()
+    assert set(results.tolist()) <= {1, -1, 0}
+
+
+def test_selfplay_output(tmp_path):
+    path = str(tmp_path / "games.bin")
+    main(["--games", "4", "--board-size", "9", "--workers", "1", "--output", path])
+    assert len(GameRecordReader(path)) == 4
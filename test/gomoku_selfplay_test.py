@@ -0,0 +1,42 @@
+import functools
+
+import numpy as np
+import pytest
+
+from gomoku.envs.board import Board
+from gomoku.envs.opponent import EasyAgent, RandomAgent, MinimaxAgent
+from gomoku.selfplay import generate_games, play_game
+
+
+def test_play_game():
+    game = play_game(EasyAgent, RandomAgent, board_size=9, seed=3)
+    assert game.black == "EasyAgent" and game.white == "RandomAgent"
+    assert game.moves.dtype == np.uint16
+    assert game.result in [1, -1, 0]
+    # replaying the moves gives the same result
+    board = Board(9)
+    for move in game.moves:
+        have_five, is_full = board.step(divmod(int(move), 9))
+    assert have_five == (game.result != 0)
+    # same seed, same game
+    assert np.array_equal(play_game(EasyAgent, RandomAgent, board_size=9, seed=3).moves, game.moves)
+
+
+def test_play_game_partial_agent():
+    agent_class = functools.partial(MinimaxAgent, max_depth=1, time_limit=0.05)
+    game = play_game(agent_class, RandomAgent, board_size=9, seed=0)
+    assert game.black == "MinimaxAgent"
+
+
+def test_generate_games():
+    games = list(generate_games(10, EasyAgent, EasyAgent, board_size=9, workers=2, chunk_size=3, seed=100))
+    assert sorted(game.seed for game in games) == list(range(100, 110))
+    for game in games:
+        assert np.array_equal(game.moves, play_game(EasyAgent, EasyAgent, board_size=9, seed=game.seed).moves)
+
+
+def test_generate_games_close_early():
+    games = generate_games(1000, RandomAgent, RandomAgent, board_size=9, workers=2, chunk_size=2)
+    first = next(games)
+    assert first.board_size == 9
+    games.close()
@@ -0,0 +1,97 @@
+import random
+
+import numpy as np
+import pytest
+from gomoku.envs.bitboard import BitBoard
+from gomoku.envs.board import Board
+from gomoku.envs.boardUtils import StoneColor
+from gomoku.envs.opponent import EasyAgent
+from gomoku.envs.shape import BoardShape, Shape, shape_table
+
+
+def _code(line):
+    """
+    :param line: 9 characters, X own stone, O blocked, anything else empty
+    """
+    return sum({'X': 1, 'O': 2}.get(cell, 0) * 3 ** i for i, cell in enumerate(line))
+
+
+@pytest.mark.parametrize("line, shape", [
+    ("....X....", Shape.none),
+    ("...XX....", Shape.two),
+    ("..X.X....", Shape.two),
+    ("...XXXO..", Shape.closed_three),
+    ("..OXXX...", Shape.closed_three),
+    ("..X.XX...", Shape.split_three),
+    ("..X.X.X..", Shape.closed_three),
+    ("...XXX...", Shape.open_three),
+    ("O..XXX..O", Shape.open_three),
+    ("O.XXX.O..", Shape.closed_three),
+    ("..OXXXX..", Shape.four),
+    (".XX.XX...", Shape.four),
+    ("...XXXX..", Shape.open_four),
+    ("X.XXX.X..", Shape.open_four),
+    ("..XXXXX..", Shape.five),
+    ("XXXXXXXXX", Shape.five),
+    ("..XOXX...", Shape.none),
+])
+def test_shape_table(line, shape):
+    assert shape_table()[_code(line)] == shape
+    # the center is taken as a stone of the color, an opponent stone there has no shape
+    assert shape_table()[_code(line[:4] + '.' + line[5:])] == shape
+    assert shape_table()[_code(line[:4] + 'O' + line[5:])] == Shape.none
+
+
+def test_BoardShape_incremental_update():
+    random.seed(0)
+    board = Board(9)
+    positions = [[r, c] for r in range(9) for c in range(9)]
+    random.shuffle(positions)
+    # shapes after every step
+    snapshots = []
+    for step, pos in enumerate(positions[:40]):
+        board.step(pos)
+        snapshots.append([board.board_shapes.shapes(color).copy() for color in StoneColor])
+        if step % 10 == 9:
+            # same shapes as a BoardShape built from the stones in another order
+            fresh = BoardShape(9)
+            for stone in reversed(board.stone_array):
+                fresh.add_stone(stone.position[0] * 9 + stone.position[1], stone.color)
+            for color in StoneColor:
+                assert np.array_equal(fresh.shapes(color), board.board_shapes.shapes(color))
+    # undo gives back the shapes of every earlier step
+    for step in range(38, 18, -1):
+        board.undo()
+        for color, shapes in zip(StoneColor, snapshots[step]):
+            assert np.array_equal(shapes, board.board_shapes.shapes(color))
+    board_shapes = BoardShape(9)
+    for stone in board.stone_array:
+        board_shapes.add_stone(stone.position[0] * 9 + stone.position[1], stone.color)
+    for color in StoneColor:
+        assert np.array_equal(board_shapes.shapes(color), board.board_shapes.shapes(color))
+
+
+def test_BoardShape_five_positions():
+    # moves making five are exactly the winning positions of BitBoard
+    random.seed(1)
+    for _ in range(10):
+        board = Board(9)
+        positions = [[r, c] for r in range(9) for c in range(9)]
+        random.shuffle(positions)
+        for pos in positions[:50]:
+            have_five, _ = board.step(pos)
+            if have_five:
+                break
+            bit_board = BitBoard.from_board_state(board.board_state, board.current_stone_color)
+            for color in StoneColor:
+                assert board.board_shapes.positions(color, Shape.five) == \
+                    sorted(bit_board.winning_positions(color))
+
+
+def test_EasyAgent_defend_split_four():
+    board = Board()
+    # white |O|O|_|O|O|, black to move
+    for pos in [[0, 0], [7, 3], [0, 2], [7, 4], [14, 14], [7, 6], [14, 12], [7, 7]]:
+        board.step(pos)
+    agent = EasyAgent(board, StoneColor.black, randomness=False, defend_opponent_four_probability=1.0)
+    assert agent.predict()[0] == [7, 5]
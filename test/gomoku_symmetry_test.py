@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from gomoku.symmetry import augment, canonicalize, inverse_transform_actions, symmetry_permutations, \
+    transform_actions
+
+
+def _random_observations(number, board_size, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(-1, 2, (number, board_size ** 2)).astype(np.int8)
+
+
+def test_symmetry_permutations():
+    permutations, inverse_permutations = symmetry_permutations(5)
+    assert permutations.shape == (8, 25)
+    assert np.array_equal(permutations[0], np.arange(25))
+    # all different
+    assert len({tuple(p) for p in permutations.tolist()}) == 8
+    for p, inverse in zip(permutations, inverse_permutations):
+        assert np.array_equal(p[inverse], np.arange(25))
+
+
+def test_augment():
+    board_size = 5
+    observations = _random_observations(3, board_size)
+    actions = np.array([0, 7, 24])
+    augmented, augmented_actions = augment(observations, actions)
+    assert augmented.shape == (24, 25)
+    for i, (observation, action) in enumerate(zip(observations, actions)):
+        board = observation.reshape(board_size, board_size)
+        one_hot = np.zeros(board_size ** 2, dtype=np.int8)
+        one_hot[action] = 1
+        one_hot = one_hot.reshape(board_size, board_size)
+        expected = [np.rot90(board, k) for k in range(4)] + [np.rot90(np.fliplr(board), k) for k in range(4)]
+        expected_actions = [np.rot90(one_hot, k) for k in range(4)] + \
+                           [np.rot90(np.fliplr(one_hot), k) for k in range(4)]
+        for k in range(8):
+            assert np.array_equal(augmented[8 * i + k], expected[k].reshape(-1))
+            assert augmented_actions[8 * i + k] == expected_actions[k].reshape(-1).argmax()
+
+
+def test_canonicalize():
+    board_size = 6
+    observations = _random_observations(10, board_size)
+    augmented, _ = augment(observations)
+    canonical, transforms = canonicalize(augmented)
+    # every symmetric copy has the same canonical position
+    assert (canonical.reshape(10, 8, -1) == canonical.reshape(10, 8, -1)[:, :1]).all()
+    # the transform gives the canonical position
+    permutations, _ = symmetry_permutations(board_size)
+    for observation, canonical_observation, transform in zip(augmented, canonical, transforms):
+        assert np.array_equal(observation[permutations[transform]], canonical_observation)
+
+
+def test_transform_actions():
+    board_size = 6
+    observations = _random_observations(4, board_size, seed=1)
+    actions = np.array([0, 5, 13, 35])
+    canonical, transforms = canonicalize(observations)
+    canonical_actions = transform_actions(actions, transforms, board_size)
+    # the stone under the action moves with it
+    assert np.array_equal(canonical[np.arange(4), canonical_actions], observations[np.arange(4), actions])
+    assert np.array_equal(inverse_transform_actions(canonical_actions, transforms, board_size), actions)
@@ -0,0 +1,142 @@
+import random
+
+import numpy as np
+import pytest
+from gomoku.envs.bitboard import BitBoard
+from gomoku.envs.board import Board
+from gomoku.envs.boardUtils import StoneColor
+from gomoku.envs.opponent import EasyAgent
+from gomoku.envs.threat_search import ThreatSolver, ThreatSearchAgent
+
+
+def _play(board, positions):
+    for position in positions:
+        board.step(position)
+
+
+def _check_vcf(board_state, color, line):
+    # every attacking move but the last one makes a four, the reply is its only five position
+    bit_board = BitBoard.from_board_state(board_state, color)
+    for i, move in enumerate(line):
+        have_five, _ = bit_board.step(move)
+        if i == len(line) - 1:
+            assert have_five
+        elif i % 2 == 0:
+            assert not have_five
+            assert line[i + 1] in bit_board.winning_positions(color)
+        else:
+            assert not have_five
+
+
+def test_ThreatSolver_five_positions():
+    board = Board()
+    # black |X|X|_|X|X|, white |O|O|O|O|
+    _play(board, [[7, 3], [9, 3], [7, 4], [9, 4], [7, 6], [9, 5], [7, 7], [9, 6]])
+    solver = ThreatSolver(15)
+    solver.set_position(board.board_state)
+    assert solver.five_positions(StoneColor.black) == [(7, 5)]
+    assert solver.five_positions(StoneColor.white) == [(9, 2), (9, 7)]
+
+
+def test_ThreatSolver_vcf():
+    board = Board()
+    # black three blocked on the left and a vertical three crossing at (7, 8)
+    _play(board, [[7, 5], [7, 4], [7, 6], [0, 0], [7, 7], [0, 14], [8, 8], [14, 0], [9, 8], [14, 14],
+                  [10, 8], [11, 8]])
+    solver = ThreatSolver(15)
+    solver.set_position(board.board_state)
+    line = solver.solve(StoneColor.black)
+    assert line is not None
+    _check_vcf(board.board_state, StoneColor.black, line)
+    # white has no forced win
+    assert solver.solve(StoneColor.white, vct=True) is None
+
+
+def test_ThreatSolver_vct():
+    board = Board()
+    # black open two and open two crossing, no four to play
+    _play(board, [[7, 6], [0, 0], [7, 7], [0, 14], [5, 8], [14, 0], [6, 8], [14, 14]])
+    solver = ThreatSolver(15)
+    solver.set_position(board.board_state)
+    assert solver.solve(StoneColor.black) is None
+    line = solver.solve(StoneColor.black, vct=True)
+    assert line is not None
+    # the line ends with five of black
+    bit_board = BitBoard.from_board_state(board.board_state, StoneColor.black)
+    for move in line[:-1]:
+        assert bit_board.step(move) == (False, False)
+    assert bit_board.step(line[-1])[0]
+    assert bit_board.current_stone_color == StoneColor.black
+
+
+def test_ThreatSolver_random_positions():
+    random.seed(0)
+    np.random.seed(0)
+    solver = ThreatSolver(15, max_nodes=5000)
+    found = 0
+    for _ in range(10):
+        board = Board()
+        agents = [EasyAgent(board, StoneColor.black), EasyAgent(board, StoneColor.white)]
+        for step in range(60):
+            color = board.current_stone_color
+            solver.set_position(board.board_state)
+            line = solver.solve(color)
+            if line is not None:
+                _check_vcf(board.board_state, color, line)
+                found += 1
+            position, _ = agents[step % 2].predict()
+            have_five, is_full = board.step(position)
+            if have_five or is_full:
+                break
+    assert found > 0
+
+
+def test_ThreatSolver_budget():
+    board = Board()
+    _play(board, [[7, 6], [0, 0], [7, 7], [0, 14], [5, 8], [14, 0], [6, 8], [14, 14]])
+    solver = ThreatSolver(15, max_nodes=1)
+    solver.set_position(board.board_state)
+    assert solver.solve(StoneColor.black, vct=True) is None
+    assert solver.nodes == 2
+
+    # an aborted search leaves the position unchanged
+    random.seed(7)
+    solver = ThreatSolver(15, max_nodes=50)
+    positions = [[r, c] for r in range(15) for c in range(15)]
+    for _ in range(50):
+        board = Board()
+        random.shuffle(positions)
+        for position in positions[:30]:
+            if any(board.step(position)):
+                break
+        solver.set_position(board.board_state)
+        cells, hash_key = list(solver._cells), solver._hash
+        for color in [StoneColor.black, StoneColor.white]:
+            solver.solve(color, vct=True)
+            assert solver._cells == cells
+            assert solver._hash == hash_key
+
+
+def test_ThreatSearchAgent_defend_split_four():
+    board = Board()
+    # white |O|O|_|O|O|, black to move
+    _play(board, [[0, 0], [7, 3], [0, 2], [7, 4], [14, 14], [7, 6], [14, 12], [7, 7]])
+    agent = ThreatSearchAgent(board, StoneColor.black, randomness=False)
+    action, _ = agent.predict()
+    assert action == [7, 5]
+
+
+def test_ThreatSearchAgent_play_vcf():
+    board = Board()
+    _play(board, [[7, 5], [7, 4], [7, 6], [0, 0], [7, 7], [0, 14], [8, 8], [14, 0], [9, 8], [14, 14],
+                  [10, 8], [11, 8]])
+    black = ThreatSearchAgent(board, StoneColor.black, randomness=False)
+    white = ThreatSearchAgent(board, StoneColor.white, randomness=False)
+    for _ in range(10):
+        action, _ = black.predict()
+        have_five, _ = board.step(action)
+        if have_five:
+            break
+        board.step(white.predict()[0])
+    assert have_five
+    assert board.current_stone_color == StoneColor.black
@@ -0,0 +1,90 @@
+import random
+
+import numpy as np
+import pytest
+
+from gomoku.envs.board import Board
+from gomoku.envs.boardUtils import StoneColor
+from gomoku.envs.gomoku_vec_env import GomokuVecEnv, five_in_a_row, pattern_reward
+
+
+def _black_reward(board):
+    return sum(pattern.number_of_stones ** 2 for pattern in board.board_patterns.black_stone_patterns)
+
+
+def test_pattern_reward_matches_BoardPattern():
+    random.seed(0)
+    board_size = 9
+    for _ in range(20):
+        board = Board(board_size)
+        positions = [[r, c] for r in range(board_size) for c in range(board_size)]
+        random.shuffle(positions)
+        for pos in positions[:random.randint(1, 60)]:
+            have_five, _ = board.step(pos)
+            black_stones = board.board_state[np.newaxis] == StoneColor.black.value
+            assert pattern_reward(black_stones)[0] == _black_reward(board)
+            assert five_in_a_row(black_stones)[0] == (have_five and board.current_stone_color == StoneColor.black)
+            if have_five:
+                break
+
+
+def test_GomokuVecEnv_reset_step():
+    env = GomokuVecEnv(4, seed=0)
+    obs = env.reset()
+    assert obs.shape == (4, 15 ** 2)
+    assert obs.dtype == np.int8
+    obs, rewards, dones, infos = env.step(np.array([112, 0, 1, 2]))
+    assert obs.shape == (4, 15 ** 2)
+    assert (rewards == 1).all()
+    assert not dones.any()
+    assert (obs == 1).sum(axis=1).tolist() == [1, 1, 1, 1]
+    assert (obs == -1).sum(axis=1).tolist() == [1, 1, 1, 1]
+    assert infos == [{}, {}, {}, {}]
+    assert (env.action_masks() == (obs == 0)).all()
+
+
+def test_GomokuVecEnv_invalid_action():
+    env = GomokuVecEnv(2, seed=0)
+    env.reset()
+    env.step(np.array([112, 112]))
+    white_action = int(np.flatnonzero(env.boards[0].flatten() == -1)[0])
+    obs, rewards, dones, infos = env.step(np.array([white_action, 0]))
+    assert rewards[0] == -1000
+    assert dones.tolist() == [True, False]
+    # finished board is reset automatically
+    assert not obs[0].any()
+    assert (infos[0]["terminal_observation"] != 0).sum() == 2
+    masks = env.action_masks()
+    assert masks[0].all()
+    assert (masks == (obs == 0)).all()
+
+
+def test_GomokuVecEnv_black_five():
+    env = GomokuVecEnv(2, board_size=9, seed=0)
+    env.reset()
+    env.boards[:, 0, :4] = 1
+    env.boards[:, 2, :4] = -1
+    # the masks follow the stones set on the boards
+    assert not env.action_masks()[:, :4].any() and not env.action_masks()[:, 18:22].any()
+    assert env.action_masks().sum() == 2 * (81 - 8)
+    obs, rewards, dones, infos = env.step(np.array([4, 9 * 8]))
+    # the opponent only played on an empty position
+    assert (env.boards[1] == -1).sum() == 5
+    assert rewards[0] == 1000 + 25
+    assert dones.tolist() == [True, False]
+    assert (infos[0]["terminal_observation"][:5] == 1).all()
+    assert not obs[0].any()
+
+
+def test_GomokuVecEnv_full_episodes():
+    env = GomokuVecEnv(8, board_size=9, seed=1)
+    obs = env.reset()
+    finished = 0
+    for _ in range(200):
+        # always play a legal position
+        actions = np.array([np.flatnonzero(o == 0)[0] for o in obs])
+        obs, rewards, dones, infos = env.step(actions)
+        finished += dones.sum()
+        for info, done in zip(infos, dones):
+            assert ("terminal_observation" in info) == done
+    assert finished > 0